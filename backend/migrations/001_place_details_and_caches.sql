@@ -0,0 +1,45 @@
+-- Brings a database created before the local gym store up to date with
+-- src/db/models.py. Run once before deploying:
+--   mysql <database> < migrations/001_place_details_and_caches.sql
+-- New databases get the same schema from DB_CREATE_ALL=true.
+
+-- Place details cached from Google, NULL until first fetched
+ALTER TABLE t_places
+    ADD COLUMN display_name VARCHAR(255) NULL,
+    ADD COLUMN formatted_address VARCHAR(255) NULL,
+    ADD COLUMN latitude FLOAT NULL,
+    ADD COLUMN longitude FLOAT NULL,
+    ADD COLUMN rating FLOAT NULL,
+    ADD COLUMN user_rating_count INTEGER NULL,
+    ADD COLUMN google_maps_uri VARCHAR(255) NULL,
+    ADD COLUMN website_uri VARCHAR(512) NULL,
+    ADD COLUMN national_phone_number VARCHAR(30) NULL,
+    ADD COLUMN photos JSON NULL,
+    ADD COLUMN refreshed_at DATETIME NULL,
+    ADD INDEX ix_t_places_refreshed_at (refreshed_at);
+
+-- Nearby search circles whose places were all fetched at refreshed_at
+CREATE TABLE IF NOT EXISTS t_search_areas (
+    id INTEGER NOT NULL AUTO_INCREMENT,
+    area_key VARCHAR(64) NOT NULL,
+    latitude FLOAT NOT NULL,
+    longitude FLOAT NOT NULL,
+    radius INTEGER NOT NULL,
+    refreshed_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (area_key),
+    INDEX ix_t_search_areas_refreshed_at (refreshed_at)
+);
+
+-- Geocoding results per normalized address, shared across workers
+CREATE TABLE IF NOT EXISTS t_geocode_cache (
+    id INTEGER NOT NULL AUTO_INCREMENT,
+    address_key VARCHAR(255) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    latitude FLOAT NULL,
+    longitude FLOAT NULL,
+    refreshed_at DATETIME NOT NULL,
+    expires_at DATETIME NULL,
+    PRIMARY KEY (id),
+    UNIQUE (address_key)
+);
@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import math
+import random
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request, Response
+
+# 1x1 transparent GIF served for every photo
+PHOTO_BYTES = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\xff\xff\xff\x00\x00\x00!\xf9\x04\x01\x00"
+    b"\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+)
+
+AUTOCOMPLETE_PLACES = [
+    "Petaling Jaya, Selangor, Malaysia",
+    "Petaling Street, Kuala Lumpur, Malaysia",
+    "Puchong, Selangor, Malaysia",
+    "Sunway Pyramid, Bandar Sunway, Selangor, Malaysia",
+    "Subang Jaya, Selangor, Malaysia",
+    "Shah Alam, Selangor, Malaysia",
+    "KLCC, Kuala Lumpur, Malaysia",
+    "Kajang, Selangor, Malaysia",
+    "Klang, Selangor, Malaysia",
+    "Bangsar, Kuala Lumpur, Malaysia",
+    "Cheras, Kuala Lumpur, Malaysia",
+    "Cyberjaya, Selangor, Malaysia",
+]
+
+
+@dataclass
+class FakeGoogleConfig:
+    latency_ms: float = 150
+    jitter_ms: float = 50
+    places_per_search: int = 20
+    seed: int = 7
+
+
+def create_fake_google_app(config: FakeGoogleConfig) -> FastAPI:
+    """
+    Stand-in for places.googleapis.com and maps.googleapis.com with
+    configurable latency. Results are deterministic for a given location.
+    """
+    app = FastAPI()
+    rng = random.Random(config.seed)
+
+    async def upstream_delay() -> None:
+        delay = config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)
+        await asyncio.sleep(max(delay, 0) / 1000)
+
+    @app.post("/v1/places:searchNearby")
+    async def search_nearby(request: Request):
+        await upstream_delay()
+        body = await request.json()
+        circle = body["locationRestriction"]["circle"]
+        lat = circle["center"]["latitude"]
+        lng = circle["center"]["longitude"]
+        radius = circle["radius"]
+        count = min(body.get("maxResultCount", 20), config.places_per_search)
+
+        # Places sit on a ~100 m lattice so overlapping searches share ids
+        places = {}
+        step = 0.001
+        for i in range(count):
+            angle = i * 2.399963  # golden angle spiral
+            distance = radius * math.sqrt((i + 0.5) / count) * 0.9
+            place_lat = round(
+                (lat + distance * math.cos(angle) / 111320) / step
+            ) * step
+            place_lng = round(
+                (lng + distance * math.sin(angle) / (111320 * math.cos(math.radians(lat)))) / step
+            ) * step
+            place_id = "fake" + hashlib.sha1(f"{place_lat:.3f},{place_lng:.3f}".encode()).hexdigest()[:20]
+            places[place_id] = {
+                "id": place_id,
+                "displayName": {"text": f"Bench Gym {place_id[-6:]}"},
+                "formattedAddress": f"{i} Jalan Bench, Kuala Lumpur",
+                "location": {"latitude": place_lat, "longitude": place_lng},
+                "rating": round(3 + (int(place_id[-2:], 16) % 20) / 10, 1),
+                "userRatingCount": int(place_id[-4:], 16) % 2000,
+                "googleMapsUri": f"https://maps.google.com/?cid={place_id}",
+                "photos": [{"name": f"places/{place_id}/photos/p{n}"} for n in range(3)],
+            }
+        return {"places": list(places.values())}
+
+    @app.get("/v1/places/{place_id}/photos/{photo_id}/media")
+    async def photo_media(place_id: str, photo_id: str):
+        await upstream_delay()
+        return Response(PHOTO_BYTES, media_type="image/gif")
+
+    @app.get("/maps/api/geocode/json")
+    async def geocode(address: str):
+        await upstream_delay()
+        seed = int(hashlib.sha1(address.encode()).hexdigest()[:8], 16)
+        return {
+            "status": "OK",
+            "results": [{
+                "geometry": {
+                    "location": {
+                        "lat": 2.9 + (seed % 4000) / 10000,
+                        "lng": 101.5 + (seed // 4000 % 3000) / 10000,
+                    }
+                }
+            }],
+        }
+
+    @app.get("/maps/api/place/autocomplete/json")
+    async def autocomplete(input: str):
+        await upstream_delay()
+        query = input.lower()
+        predictions = [
+            {"description": place, "place_id": hashlib.sha1(place.encode()).hexdigest()[:20]}
+            for place in AUTOCOMPLETE_PLACES
+            if query in place.lower()
+        ][:5]
+        return {"status": "OK" if predictions else "ZERO_RESULTS", "predictions": predictions}
+
+    return app
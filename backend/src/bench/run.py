@@ -0,0 +1,253 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime
+from typing import Awaitable, Callable
+
+import httpx
+
+from src.bench.fake_google import AUTOCOMPLETE_PLACES, FakeGoogleConfig, create_fake_google_app
+
+SCENARIOS = ("nearby", "autocomplete", "login", "me")
+
+BENCH_USER = {
+    "user_username": "bench_user",
+    "user_password": "bench-password",
+    "user_email": "bench_user@example.com",
+    "user_age": 30,
+    "user_gender": "Male",
+}
+
+# Search centers around the Klang Valley, jittered per request
+SEARCH_CENTERS = [
+    (3.1579, 101.7116),  # KLCC
+    (3.0733, 101.6078),  # Sunway Pyramid
+    (3.1073, 101.6067),  # Petaling Jaya
+    (3.0738, 101.5183),  # Shah Alam
+    (3.1291, 101.6710),  # Bangsar
+]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": round((len(latencies) + errors) / elapsed, 2) if elapsed else 0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def drive(
+    name: str,
+    request_fn: Callable[[int], Awaitable[httpx.Response]],
+    total: int,
+    concurrency: int,
+) -> dict:
+    """Issue `total` requests from `concurrency` workers and summarize latency"""
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await request_fn(i)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, errors, time.perf_counter() - start)
+    print(
+        f"{name:<14} {result['throughput_rps']:>9.1f} rps  "
+        f"p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+        f"p99 {result['p99_ms']:>8.2f} ms  errors {errors}"
+    )
+    return result
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 60) -> None:
+    """Poll /ready so warm-up is not part of the measurement"""
+    deadline = time.monotonic() + timeout
+    while (await client.get("/ready")).status_code != 200:
+        if time.monotonic() > deadline:
+            raise RuntimeError("server did not become ready")
+        await asyncio.sleep(0.1)
+
+
+async def login(client: httpx.AsyncClient) -> str:
+    """Register the bench user if needed and return its access token"""
+    await client.post("/auth/register", json=BENCH_USER)
+    response = await client.post(
+        "/auth/login",
+        data={"username": BENCH_USER["user_username"], "password": BENCH_USER["user_password"]},
+    )
+    response.raise_for_status()
+    return response.cookies["access_token"]
+
+
+def scenario_requests(
+    client: httpx.AsyncClient, token: str, jitter_degrees: float
+) -> dict[str, Callable[[int], Awaitable[httpx.Response]]]:
+    rng = random.Random(42)
+    prefixes = [
+        place[:length]
+        for place in AUTOCOMPLETE_PLACES
+        for length in range(1, len(place.split(",")[0]) + 1)
+    ]
+
+    def nearby(i: int):
+        lat, lng = SEARCH_CENTERS[i % len(SEARCH_CENTERS)]
+        return client.get("/places/nearby-gyms", params={
+            "lat": lat + rng.uniform(-jitter_degrees, jitter_degrees),
+            "lng": lng + rng.uniform(-jitter_degrees, jitter_degrees),
+            "radius": 1500,
+        })
+
+    def autocomplete(i: int):
+        return client.get("/places/autocomplete", params={"input": prefixes[i % len(prefixes)]})
+
+    def login_request(i: int):
+        return client.post("/auth/login", data={
+            "username": BENCH_USER["user_username"],
+            "password": BENCH_USER["user_password"],
+        })
+
+    def me(i: int):
+        return client.get("/user/me", headers={"Cookie": f"access_token={token}"})
+
+    return {"nearby": nearby, "autocomplete": autocomplete, "login": login_request, "me": me}
+
+
+async def run(args: argparse.Namespace) -> dict:
+    async with AsyncExitStack() as stack:
+        if args.target:
+            client = await stack.enter_async_context(
+                httpx.AsyncClient(base_url=args.target, timeout=60)
+            )
+        else:
+            # Boot the real app in-process with Google swapped for the fake
+            from src.main import app
+            from src.core.google_client import GoogleClient, get_google_client
+
+            fake = create_fake_google_app(FakeGoogleConfig(
+                latency_ms=args.upstream_latency_ms,
+                jitter_ms=args.upstream_jitter_ms,
+            ))
+            google = GoogleClient(
+                api_key="bench",
+                places_base_url="http://fake-google",
+                maps_base_url="http://fake-google",
+                transport=httpx.ASGITransport(app=fake),
+            )
+            stack.push_async_callback(google.aclose)
+            app.dependency_overrides[get_google_client] = lambda: google
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = await stack.enter_async_context(httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="https://bench",
+                timeout=60,
+            ))
+
+        await wait_until_ready(client)
+        token = await login(client)
+        requests = scenario_requests(client, token, args.jitter_degrees)
+
+        results = {}
+        for name in args.scenarios:
+            for i in range(args.warmup):
+                await requests[name](i)
+            results[name] = await drive(name, requests[name], args.requests, args.concurrency)
+
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict) -> None:
+    """Print the change against a saved baseline run"""
+    print("\nvs baseline", baseline["meta"].get("revision"))
+    for name, result in results.items():
+        base = baseline["scenarios"].get(name)
+        if not base:
+            continue
+        deltas = []
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            if base[key]:
+                deltas.append(f"{key} {(result[key] - base[key]) / base[key] * 100:+.1f}%")
+        print(f"{name:<14} " + "  ".join(deltas))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the hot endpoints against a fake Google API"
+    )
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per scenario")
+    parser.add_argument("--upstream-latency-ms", type=float, default=150)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=50)
+    parser.add_argument(
+        "--jitter-degrees", type=float, default=0.01,
+        help="random offset applied to nearby search centers",
+    )
+    parser.add_argument(
+        "--target", help="base URL of a running server instead of the in-process app"
+    )
+    parser.add_argument("--output", help="json file to save results to")
+    parser.add_argument("--baseline", help="json file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    scenarios = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "target": args.target or "in-process",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "upstream_latency_ms": args.upstream_latency_ms,
+        },
+        "scenarios": scenarios,
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            compare(scenarios, json.load(file))
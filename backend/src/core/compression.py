@@ -0,0 +1,30 @@
+from starlette.middleware.gzip import GZipMiddleware
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+
+class SelectiveCompressionMiddleware:
+    """
+    Brotli (when the optional brotli-asgi package is installed, falling
+    back to gzip for clients without br) or gzip compression for responses
+    over `minimum_size`, bypassed for paths starting with `skip_prefixes`
+    """
+
+    def __init__(self, app, minimum_size: int, skip_prefixes: tuple[str, ...] = ()):
+        self.app = app
+        self.skip_prefixes = skip_prefixes
+        if BrotliMiddleware is not None:
+            self.compressed_app = BrotliMiddleware(
+                app, minimum_size=minimum_size, gzip_fallback=True
+            )
+        else:
+            self.compressed_app = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_prefixes):
+            await self.app(scope, receive, send)
+            return
+        await self.compressed_app(scope, receive, send)
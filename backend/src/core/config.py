@@ -1,36 +1,218 @@
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
-from pydantic import Field, SecretStr, field_validator
+from pydantic import Field, SecretStr, field_validator, model_validator
 
 
 class Settings(BaseSettings):
-    SECRET_KEY: str = Field(default=...)
-    DATABASE_URL: str = Field(default=...)
-    GEOAPIFY_API_KEY: str = Field(default=...)
-    MAIL_USERNAME: str = Field(default=...)
-    MAIL_PASSWORD: SecretStr = Field(default=...)
-    MAIL_FROM: str = Field(default=...)
-    MAIL_PORT: int = Field(default=...)
-    MAIL_SERVER: str = Field(default=...)
-    MAIL_FROM_NAME: str = Field(default=...)
-    GOOGLE_PLACES_API_KEY: str = Field(default=...)
+    # Required to serve requests, checked in main.lifespan rather than on
+    # import so tooling such as generate_openapi.py runs without secrets
+    SECRET_KEY: str = Field(default="")
+    DATABASE_URL: str = Field(default="")
+    GOOGLE_PLACES_API_KEY: str = Field(default="")
+
+    # Unused by the backend today
+    GEOAPIFY_API_KEY: Optional[str] = None
+    MAIL_USERNAME: Optional[str] = None
+    MAIL_PASSWORD: Optional[SecretStr] = None
+    MAIL_FROM: Optional[str] = None
+    MAIL_PORT: Optional[int] = None
+    MAIL_SERVER: Optional[str] = None
+    MAIL_FROM_NAME: Optional[str] = None
 
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # bcrypt thread pool
+    PASSWORD_HASH_MAX_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5
+
+    # Authenticated users cached by token digest
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 300
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    # Carry id, role and profile as signed claims so auth never hits MySQL.
+    # Role changes then only apply once the user's current token expires.
+    AUTH_STATELESS_CLAIMS: bool = False
+
+    # Startup. Schema creation is opt-in; readiness waits for the warm-up.
+    DB_CREATE_ALL: bool = False
+    DB_WARM_CONNECTIONS: int = 5  # the pool's default size
+    WARMUP_RETRY_SECONDS: float = 5
+
+    # Per-request SQL tracing headers and logs, for debugging
+    SQL_TRACE_ENABLED: bool = False
+
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 1000
+
+    # HTTP Cache-Control policies for the read endpoints
+    NEARBY_CACHE_CONTROL: str = "public, max-age=30, stale-while-revalidate=120"
+    GEOCODE_CACHE_CONTROL: str = "public, max-age=86400, stale-while-revalidate=604800"
+    AUTOCOMPLETE_CACHE_CONTROL: str = "public, max-age=3600, stale-while-revalidate=86400"
+
+    # Shared Google API client
+    GOOGLE_HTTP2: bool = False  # needs the optional h2 package
+    GOOGLE_MAX_CONNECTIONS: int = 50
+    GOOGLE_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    GOOGLE_KEEPALIVE_EXPIRY_SECONDS: float = 30
+    GOOGLE_NEARBY_TIMEOUT_SECONDS: float = 10
+    GOOGLE_GEOCODE_TIMEOUT_SECONDS: float = 5
+    GOOGLE_AUTOCOMPLETE_TIMEOUT_SECONDS: float = 3
+    GOOGLE_PHOTO_TIMEOUT_SECONDS: float = 10
+    GOOGLE_MAX_RETRIES: int = 2
+    GOOGLE_BACKOFF_BASE_SECONDS: float = 0.2
+    GOOGLE_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    GOOGLE_CIRCUIT_RESET_SECONDS: float = 30
+
+    # Upstream quota governor, applied to every Google call
+    QUOTA_GLOBAL_RATE_PER_SECOND: float = 10
+    QUOTA_GLOBAL_BURST: int = 50
+    QUOTA_CLIENT_RATE_PER_SECOND: float = 2
+    # Room for one sweep with its splits plus NEARBY_SWEEP_SPLIT_RESERVE
+    QUOTA_CLIENT_BURST: int = 40
+    QUOTA_MAX_CONCURRENCY: int = 20
+    QUOTA_QUEUE_TIMEOUT_SECONDS: float = 2
+    # Photo downloads have their own budget and slots, so a page of cold
+    # photos neither spends the search budget nor queues behind searches
+    QUOTA_PHOTO_RATE_PER_SECOND: float = 20
+    QUOTA_PHOTO_BURST: int = 200
+    QUOTA_PHOTO_CLIENT_RATE_PER_SECOND: float = 10
+    QUOTA_PHOTO_CLIENT_BURST: int = 120  # every photo of two result pages
+    QUOTA_PHOTO_MAX_CONCURRENCY: int = 20
+    QUOTA_PHOTO_QUEUE_TIMEOUT_SECONDS: float = 10
+    # Proxies in front of the app that append to X-Forwarded-For (1 on
+    # Render). Quota is charged to the address the outermost one saw.
+    TRUSTED_PROXY_COUNT: int = 0
+    # Map tile fills are charged to one shared bucket, not the caller's,
+    # and leave the last QUOTA_TILES_GLOBAL_RESERVE global tokens to users
+    QUOTA_TILES_RATE_PER_SECOND: float = 2
+    QUOTA_TILES_BURST: int = 30  # one cold zoom-13 view is 28 searches
+    QUOTA_TILES_GLOBAL_RESERVE: int = 20
+    # Over budget, serve stored results up to this old instead of failing.
+    # Must exceed PLACES_AREA_FRESH_SECONDS or nothing is ever served stale.
+    QUOTA_STALE_MAX_AGE_SECONDS: int = 30 * 24 * 3600
+    STALE_CACHE_CONTROL: str = "no-store"
+
+    # Background refresh of the hottest nearby areas and addresses
+    REFRESH_ENABLED: bool = True
+    REFRESH_INTERVAL_SECONDS: float = 60
+    REFRESH_JITTER: float = 0.25  # fraction of the interval
+    REFRESH_LEAD_SECONDS: int = 300  # refresh entries expiring within this
+    REFRESH_TOP_N: int = 50  # per source
+    REFRESH_MIN_SCORE: float = 2
+    REFRESH_UPSTREAM_BUDGET: int = 20  # refreshes per cycle
+    REFRESH_CONCURRENCY: int = 4
+    REFRESH_HOT_HALF_LIFE_SECONDS: float = 1800
+    REFRESH_TRACKED_KEYS: int = 10000
+
+    # Nearby gyms response cache
+    NEARBY_CACHE_TTL_SECONDS: int = 900
+    NEARBY_CACHE_MAX_ENTRIES: int = 2048
+    NEARBY_CACHE_CELL_DEGREES: float = 0.002  # ~220 m grid cells
+    NEARBY_CACHE_RADIUS_BUCKET_METERS: int = 250
+
+    # sort=score: Bayesian-average rating blended with distance
+    RANKING_PRIOR_RATING: float = 4.0
+    RANKING_PRIOR_REVIEWS: int = 20
+    RANKING_DISTANCE_WEIGHT: float = 0.3
+
+    # Sub-circle sweep for searches beyond 20 results
+    NEARBY_SWEEP_MAX_RINGS: int = 2  # at most 19 sub-circles
+    NEARBY_SWEEP_MIN_SUB_RADIUS_METERS: int = 1000
+    NEARBY_SWEEP_CONCURRENCY: int = 8
+    # Sub-circles that come back full are split again, within this many
+    # sub-searches per sweep and down to this radius. Splits are only made
+    # while they leave this many calls in the caller's quota bucket.
+    NEARBY_SWEEP_MAX_SEARCHES: int = 32
+    NEARBY_SWEEP_MIN_SPLIT_RADIUS_METERS: int = 500
+    NEARBY_SWEEP_SPLIT_RESERVE: int = 8
+
+    # Map tiles, filled once per TTL at TILE_FILL_ZOOM and clipped for other zooms
+    TILE_MIN_ZOOM: int = 13
+    TILE_FILL_ZOOM: int = 14  # ~2.4 km tiles, 7 sub-searches each
+    TILE_MAX_ZOOM: int = 20
+    TILE_CACHE_TTL_SECONDS: int = 900
+    TILE_CACHE_MAX_ENTRIES: int = 4096
+    TILE_VERSION_SECONDS: int = 900
+    TILE_CACHE_CONTROL: str = "public, max-age=31536000, immutable"
+
+    # Autocomplete prefix cache
+    AUTOCOMPLETE_CACHE_TTL_SECONDS: int = 3600
+    AUTOCOMPLETE_CACHE_MAX_ENTRIES: int = 10000
+    AUTOCOMPLETE_PREFIX_FILTER: bool = True
+    AUTOCOMPLETE_COMPLETE_BELOW: int = 5  # Google returns at most 5 predictions
+
+    # Geocode cache, L1 in process in front of t_geocode_cache
+    GEOCODE_L1_TTL_SECONDS: int = 3600
+    GEOCODE_L1_MAX_ENTRIES: int = 10000
+    GEOCODE_NEGATIVE_TTL_SECONDS: int = 24 * 3600
+
+    # Photo proxy
+    PUBLIC_BASE_URL: str = ""  # defaults to the URL the request came in on
+    PHOTO_CACHE_DIR: str = ".cache/photos"
+    PHOTO_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    PHOTO_MAX_WIDTH_PX: int = 400
+    # Requested widths are rounded up to one of these, so a photo has a few
+    # cache keys and billed downloads rather than one per pixel width
+    PHOTO_WIDTHS_PX: list[int] = [100, 200, 400, 800, 1600]
+
+    # Live walk-in updates. Use redis when running more than one worker.
+    PUBSUB_BACKEND: Literal["memory", "redis"] = "memory"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    PUBSUB_CHANNEL: str = "fitfinder:walk-in"
+    WALK_IN_STREAM_MAX_IDS: int = 500
+    WALK_IN_STREAM_QUEUE_SIZE: int = 256  # per subscriber, then it is resynced
+    WALK_IN_STREAM_KEEPALIVE_SECONDS: float = 15
+
+    # Bulk walk-in import/export
+    WALK_IN_BULK_CHUNK_SIZE: int = 1000
+
+    # Local gym store and spatial index
+    PLACES_INDEX_CELL_DEGREES: float = 0.01  # ~1.1 km grid cells
+    PLACES_AREA_CELL_DEGREES: float = 0.05
+    PLACES_AREA_FRESH_SECONDS: int = 7 * 24 * 3600
+
     class Config:
         env_file = ".env"
     
     @field_validator('SECRET_KEY')
     def validate_secret_key(cls, v):
-        if len(v) < 32:
+        if v and len(v) < 32:
             raise ValueError("Secret key must be >=32 characters")
         return v
 
     @field_validator('DATABASE_URL')
     def validate_db_url(cls, v):
-        if not v.startswith(("mysql+aiomysql://")):
+        if v and not v.startswith(("mysql+aiomysql://")):
             raise ValueError("Invalid MySQL database URL format")
         return v
 
+    @model_validator(mode="after")
+    def validate_stale_window(self):
+        if self.QUOTA_STALE_MAX_AGE_SECONDS <= self.PLACES_AREA_FRESH_SECONDS:
+            raise ValueError(
+                "QUOTA_STALE_MAX_AGE_SECONDS must be longer than PLACES_AREA_FRESH_SECONDS"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def validate_tiles_budget(self):
+        if self.QUOTA_TILES_BURST + self.QUOTA_TILES_GLOBAL_RESERVE > self.QUOTA_GLOBAL_BURST:
+            raise ValueError(
+                "QUOTA_TILES_BURST plus QUOTA_TILES_GLOBAL_RESERVE must fit in QUOTA_GLOBAL_BURST"
+            )
+        if self.QUOTA_TILES_RATE_PER_SECOND >= self.QUOTA_GLOBAL_RATE_PER_SECOND:
+            raise ValueError(
+                "QUOTA_TILES_RATE_PER_SECOND must be below QUOTA_GLOBAL_RATE_PER_SECOND"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def validate_sweep_budget(self):
+        if self.NEARBY_SWEEP_MAX_SEARCHES + self.NEARBY_SWEEP_SPLIT_RESERVE > self.QUOTA_CLIENT_BURST:
+            raise ValueError(
+                "NEARBY_SWEEP_MAX_SEARCHES plus NEARBY_SWEEP_SPLIT_RESERVE must fit in QUOTA_CLIENT_BURST"
+            )
+        return self
+
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
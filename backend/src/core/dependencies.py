@@ -3,12 +3,20 @@ from fastapi import Cookie, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
-from src.schemas.user import UserRole
+from src.schemas.user import UserResponse, UserRole
 from src.db.models import User
 from src.db.database import AsyncSessionLocal
-from src.core.security import SECRET_KEY, ALGORITHM
+from src.core.config import settings
+from src.core.metrics import registry, stats_gauge
+from src.core.principal_cache import PrincipalCache
 from sqlalchemy import select
 
+principal_cache = PrincipalCache(
+    maxsize=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+)
+stats_gauge(registry, "principal_cache", "Auth principal cache counters", principal_cache.stats)
+
 current_user_responses: dict[int | str, dict[str, Any]] = {
     status.HTTP_401_UNAUTHORIZED: {
         "description": "Missing or invalid authentication credentials",
@@ -33,43 +41,56 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 
 
+def user_from_claims(payload: dict) -> UserResponse | None:
+    """User snapshot carried in a stateless-mode token, if present"""
+    if not settings.AUTH_STATELESS_CLAIMS or "uid" not in payload:
+        return None
+    return UserResponse(
+        user_id=payload["uid"],
+        user_username=payload["sub"],
+        user_role=payload["role"],
+        user_email=payload["email"],
+        user_age=payload["age"],
+        user_gender=payload["gender"],
+    )
+
+
 async def get_current_user(
     access_token: Annotated[str | None, Cookie(alias="access_token")] = None,
     db: AsyncSession = Depends(get_db)
-) -> User:
-    print(f"Access token received: {access_token is not None}")  # Debug
-    
+) -> UserResponse:
     if access_token is None:
-        print("No access token found in cookies")  # Debug
         raise HTTPException(status_code=401, detail="Not authenticated")
 
+    user = principal_cache.get(access_token)
+    if user is not None:
+        return user
+
     try:
-        payload = jwt.decode(access_token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str | None = payload.get("sub")
-        print(f"Username from token: {username}")  # Debug
-        
-        if not username:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        
-        # Use async query
+        payload = jwt.decode(access_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    username: str | None = payload.get("sub")
+    if not username:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user = user_from_claims(payload)
+    if user is None:
         result = await db.execute(
             select(User).where(User.user_username == username)
         )
-        user = result.scalar_one_or_none()
-        
-        if not user:
-            print(f"User {username} not found in database")  # Debug
+        db_user = result.scalar_one_or_none()
+
+        if not db_user:
             raise HTTPException(status_code=401, detail="User not found")
-        
-        print(f"User found: {user.user_username}, Role: {user.user_role}")  # Debug
-        return user
-        
-    except JWTError as e:
-        print(f"JWT Error: {e}")  # Debug
-        raise HTTPException(status_code=401, detail="Invalid token")
+        user = UserResponse.model_validate(db_user)
+
+    principal_cache.set(access_token, user, payload.get("exp"))
+    return user
 
 
-async def get_current_admin_user(current_user: User = Depends(get_current_user)):
+async def get_current_admin_user(current_user: UserResponse = Depends(get_current_user)):
     if current_user.user_role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     return current_user
\ No newline at end of file
@@ -0,0 +1,333 @@
+import asyncio
+import contextlib
+import hashlib
+import random
+import time
+from typing import Any, BinaryIO
+
+import certifi
+import httpx
+
+from src.core.config import settings
+from src.core.metrics import UPSTREAM_IN_FLIGHT, UPSTREAM_REQUEST_DURATION, registry, stats_gauge
+from src.core.quota import QuotaExceededError, QuotaGovernor
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+PLACES_BASE_URL = "https://places.googleapis.com"
+MAPS_BASE_URL = "https://maps.googleapis.com"
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Shared quota client that map tile fills are charged to
+TILES_QUOTA_CLIENT = "tiles"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Google while the circuit breaker is open"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Google API circuit open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+# Everything a Google client call raises instead of returning a response
+GOOGLE_ERRORS = (httpx.HTTPError, CircuitOpenError, QuotaExceededError)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds, then lets a single trial call through.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == "open" or (state == "half-open" and self._trial_in_flight):
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(max(remaining, 1))
+        if state == "half-open":
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class GoogleClient:
+    """Shared, pooled HTTP client for the Google Places and Geocoding APIs"""
+
+    def __init__(
+        self,
+        api_key: str,
+        places_base_url: str = PLACES_BASE_URL,
+        maps_base_url: str = MAPS_BASE_URL,
+        transport: httpx.AsyncBaseTransport | None = None,
+        governor: QuotaGovernor | None = None,
+        photo_governor: QuotaGovernor | None = None,
+    ):
+        self.api_key = api_key
+        self.governor = governor
+        self.photo_governor = photo_governor
+        self.places_base_url = places_base_url
+        self.maps_base_url = maps_base_url
+        self.max_retries = settings.GOOGLE_MAX_RETRIES
+        self.backoff_base = settings.GOOGLE_BACKOFF_BASE_SECONDS
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.GOOGLE_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.GOOGLE_CIRCUIT_RESET_SECONDS,
+        )
+        self._client = httpx.AsyncClient(
+            verify=certifi.where(),
+            http2=settings.GOOGLE_HTTP2 and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=settings.GOOGLE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GOOGLE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.GOOGLE_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            transport=transport,
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _admit(self, governor: QuotaGovernor | None) -> contextlib.AbstractAsyncContextManager:
+        """Governor slot for one call, unlimited when no governor is set"""
+        if governor is None:
+            return contextlib.nullcontext()
+        return governor.slot()
+
+    def _backoff_delay(self, attempt: int, response: httpx.Response | None) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when present"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        return random.uniform(0, self.backoff_base * 2 ** attempt)
+
+    async def _send(
+        self, endpoint: str, method: str, url: str, timeout: float, **kwargs: Any
+    ) -> httpx.Response:
+        """One attempt, recorded in the upstream latency histogram"""
+        status = "error"
+        UPSTREAM_IN_FLIGHT.inc(endpoint=endpoint)
+        start = time.perf_counter()
+        try:
+            response = await self._client.request(
+                method, url, timeout=httpx.Timeout(timeout), **kwargs
+            )
+            status = str(response.status_code)
+            return response
+        finally:
+            UPSTREAM_IN_FLIGHT.dec(endpoint=endpoint)
+            UPSTREAM_REQUEST_DURATION.observe(
+                time.perf_counter() - start, endpoint=endpoint, status=status
+            )
+
+    async def request(
+        self, endpoint: str, method: str, url: str, timeout: float, **kwargs: Any
+    ) -> httpx.Response:
+        """
+        Send a request with retries on 429/5xx and transport errors.
+        Raises httpx.HTTPStatusError / httpx.RequestError when retries run out,
+        CircuitOpenError while the breaker is open and QuotaExceededError
+        when the governor rejects the call.
+        """
+        async with self._admit(self.governor):
+            return await self._request_with_retries(endpoint, method, url, timeout, **kwargs)
+
+    async def _request_with_retries(
+        self, endpoint: str, method: str, url: str, timeout: float, **kwargs: Any
+    ) -> httpx.Response:
+        self.breaker.before_call()
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = await self._send(endpoint, method, url, timeout, **kwargs)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    break
+            except httpx.RequestError:
+                if attempt == self.max_retries:
+                    self.breaker.record_failure()
+                    raise
+
+            if attempt == self.max_retries:
+                break
+            delay = self._backoff_delay(attempt, response)
+            if response is not None and delay > timeout:
+                # Sleeping out a long Retry-After would hold the quota slot and
+                # the caller's request, so fail now and let the router degrade
+                break
+            await asyncio.sleep(delay)
+
+        if response.status_code in RETRY_STATUS_CODES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+        response.raise_for_status()
+        return response
+
+    async def search_nearby(self, payload: dict, field_mask: str) -> dict:
+        response = await self.request(
+            "searchNearby",
+            "POST",
+            f"{self.places_base_url}/v1/places:searchNearby",
+            timeout=settings.GOOGLE_NEARBY_TIMEOUT_SECONDS,
+            json=payload,
+            headers={
+                "Content-Type": "application/json",
+                "X-Goog-Api-Key": self.api_key,
+                "X-Goog-FieldMask": field_mask,
+            },
+        )
+        return response.json()
+
+    async def geocode(self, address: str) -> dict:
+        response = await self.request(
+            "geocode",
+            "GET",
+            f"{self.maps_base_url}/maps/api/geocode/json",
+            timeout=settings.GOOGLE_GEOCODE_TIMEOUT_SECONDS,
+            params={"address": address, "key": self.api_key},
+        )
+        return response.json()
+
+    async def autocomplete(self, input: str) -> dict:
+        response = await self.request(
+            "autocomplete",
+            "GET",
+            f"{self.maps_base_url}/maps/api/place/autocomplete/json",
+            timeout=settings.GOOGLE_AUTOCOMPLETE_TIMEOUT_SECONDS,
+            params={"input": input, "key": self.api_key},
+        )
+        return response.json()
+
+    async def download_photo(
+        self, photo_name: str, max_width: int, destination: BinaryIO
+    ) -> tuple[str, str]:
+        """
+        Stream a place photo into `destination` without buffering it,
+        returning (sha256 hex digest, content type)
+        """
+        async with self._admit(self.photo_governor):
+            return await self._download_photo(photo_name, max_width, destination)
+
+    async def _download_photo(
+        self, photo_name: str, max_width: int, destination: BinaryIO
+    ) -> tuple[str, str]:
+        self.breaker.before_call()
+        digest = hashlib.sha256()
+        status = "error"
+        UPSTREAM_IN_FLIGHT.inc(endpoint="photo")
+        start = time.perf_counter()
+        try:
+            async with self._client.stream(
+                "GET",
+                f"{self.places_base_url}/v1/{photo_name}/media",
+                params={"maxWidthPx": max_width, "key": self.api_key},
+                timeout=httpx.Timeout(settings.GOOGLE_PHOTO_TIMEOUT_SECONDS),
+                follow_redirects=True,
+            ) as response:
+                status = str(response.status_code)
+                if response.is_error:
+                    await response.aread()  # error text is used in the message
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    digest.update(chunk)
+                    destination.write(chunk)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        except httpx.RequestError:
+            self.breaker.record_failure()
+            raise
+        finally:
+            UPSTREAM_IN_FLIGHT.dec(endpoint="photo")
+            UPSTREAM_REQUEST_DURATION.observe(
+                time.perf_counter() - start, endpoint="photo", status=status
+            )
+
+        self.breaker.record_success()
+        return digest.hexdigest(), response.headers.get("Content-Type", "image/jpeg")
+
+
+# Shared by every Google call the app makes, whichever client instance runs it
+quota_governor = QuotaGovernor(
+    global_rate=settings.QUOTA_GLOBAL_RATE_PER_SECOND,
+    global_burst=settings.QUOTA_GLOBAL_BURST,
+    client_rate=settings.QUOTA_CLIENT_RATE_PER_SECOND,
+    client_burst=settings.QUOTA_CLIENT_BURST,
+    max_concurrency=settings.QUOTA_MAX_CONCURRENCY,
+    queue_timeout=settings.QUOTA_QUEUE_TIMEOUT_SECONDS,
+    shared_clients={
+        TILES_QUOTA_CLIENT: (settings.QUOTA_TILES_RATE_PER_SECOND, settings.QUOTA_TILES_BURST),
+    },
+    shared_reserve=settings.QUOTA_TILES_GLOBAL_RESERVE,
+)
+stats_gauge(registry, "google_quota", "Google API quota governor counters", quota_governor.stats)
+
+photo_quota_governor = QuotaGovernor(
+    global_rate=settings.QUOTA_PHOTO_RATE_PER_SECOND,
+    global_burst=settings.QUOTA_PHOTO_BURST,
+    client_rate=settings.QUOTA_PHOTO_CLIENT_RATE_PER_SECOND,
+    client_burst=settings.QUOTA_PHOTO_CLIENT_BURST,
+    max_concurrency=settings.QUOTA_PHOTO_MAX_CONCURRENCY,
+    queue_timeout=settings.QUOTA_PHOTO_QUEUE_TIMEOUT_SECONDS,
+)
+stats_gauge(
+    registry, "google_photo_quota", "Google photo download quota counters",
+    photo_quota_governor.stats
+)
+
+google_client: GoogleClient | None = None
+
+
+async def stop_google_client() -> None:
+    global google_client
+    if google_client is not None:
+        await google_client.aclose()
+        google_client = None
+
+
+def get_google_client() -> GoogleClient:
+    """Dependency returning the shared Google client, created on first use"""
+    global google_client
+    if google_client is None:
+        google_client = GoogleClient(
+            api_key=settings.GOOGLE_PLACES_API_KEY,
+            governor=quota_governor,
+            photo_governor=photo_quota_governor
+        )
+    return google_client
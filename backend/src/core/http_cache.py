@@ -0,0 +1,40 @@
+import hashlib
+from typing import Any
+
+import orjson
+from fastapi import Request, Response
+
+
+def compute_etag(body: bytes) -> str:
+    """
+    Weak ETag over the response body. Weak because the compression
+    middleware may re-encode the bytes on the way out.
+    """
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match, as RFC 9110 requires for GET"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def cacheable_json_response(
+    request: Request,
+    content: Any,
+    cache_control: str,
+    headers: dict[str, str] | None = None
+) -> Response:
+    """JSON response with an ETag and Cache-Control, or 304 when the client copy is current"""
+    body = orjson.dumps(content)
+    headers = {**(headers or {}), "ETag": compute_etag(body), "Cache-Control": cache_control}
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
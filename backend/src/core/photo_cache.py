@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class PhotoEntry:
+    path: Path
+    digest: str
+    content_type: str
+
+
+class PhotoDiskCache:
+    """
+    Content-addressed photo store on disk with a size-bounded LRU.
+
+    Image bytes live in blobs/<sha256 of content>, and refs/<sha256 of key>
+    points a request key (photo name + size) at a blob. Blob mtimes are
+    bumped on every hit and the oldest blobs are evicted first, together
+    with the refs pointing at them. store runs in the threadpool, so
+    storing and evicting happen under a lock.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._blobs = self.directory / "blobs"
+        self._refs = self.directory / "refs"
+        self._blobs.mkdir(parents=True, exist_ok=True)
+        self._refs.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._total_bytes = sum(blob.stat().st_size for blob in self._blobs.iterdir())
+        # Ref files per blob digest, so eviction can delete them with the blob
+        self._blob_refs: dict[str, set[Path]] = {}
+        for ref_path in self._refs.iterdir():
+            digest = self._ref_digest(ref_path)
+            if digest is not None:
+                self._blob_refs.setdefault(digest, set()).add(ref_path)
+
+    def _ref_path(self, key: str) -> Path:
+        return self._refs / hashlib.sha256(key.encode()).hexdigest()
+
+    @staticmethod
+    def _ref_digest(ref_path: Path) -> str | None:
+        try:
+            return json.loads(ref_path.read_text())["digest"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def lookup(self, key: str) -> PhotoEntry | None:
+        try:
+            ref = json.loads(self._ref_path(key).read_text())
+            path = self._blobs / ref["digest"]
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return PhotoEntry(path=path, digest=ref["digest"], content_type=ref["content_type"])
+
+    def open_temp(self):
+        """Temporary file in the cache directory, for streaming a download into"""
+        return tempfile.NamedTemporaryFile(dir=self.directory, delete=False)
+
+    def store(self, key: str, temp_path: str, digest: str, content_type: str) -> PhotoEntry:
+        """Move a fully written temp file into the store and point `key` at it"""
+        path = self._blobs / digest
+        with self._lock:
+            if path.exists():
+                os.unlink(temp_path)
+                os.utime(path)  # so it is not the next blob evicted
+            else:
+                os.replace(temp_path, path)
+                self._total_bytes += path.stat().st_size
+
+            ref_path = self._ref_path(key)
+            temp_ref = ref_path.with_suffix(".tmp")
+            temp_ref.write_text(json.dumps({"digest": digest, "content_type": content_type}))
+            os.replace(temp_ref, ref_path)
+            self._blob_refs.setdefault(digest, set()).add(ref_path)
+
+            self._evict()
+        return PhotoEntry(path=path, digest=digest, content_type=content_type)
+
+    def _evict(self) -> None:
+        """Drop least recently used blobs and the refs still pointing at them"""
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        blobs = sorted(self._blobs.iterdir(), key=lambda blob: blob.stat().st_mtime)
+        for blob in blobs:
+            if self._total_bytes <= self.max_bytes:
+                break
+            size = blob.stat().st_size
+            blob.unlink(missing_ok=True)
+            self._total_bytes -= size
+            for ref_path in self._blob_refs.pop(blob.name, ()):
+                # The key may have been stored again with another blob since
+                if self._ref_digest(ref_path) == blob.name:
+                    ref_path.unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,136 @@
+import re
+import time
+from collections import OrderedDict
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase and collapse whitespace so keystroke variants share a key"""
+    return " ".join(text.lower().split())
+
+
+def prediction_matches(prediction: dict, query: str) -> bool:
+    """Every word of the query must start some word of the prediction"""
+    words = WORD_PATTERN.findall(prediction.get("description", "").lower())
+    return all(
+        any(word.startswith(token) for word in words)
+        for token in WORD_PATTERN.findall(query)
+    )
+
+
+class _TrieNode:
+    __slots__ = ("children", "entry")
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}
+        self.entry: tuple[float, list[dict]] | None = None
+
+
+class PrefixCache:
+    """
+    Trie of autocomplete predictions keyed by normalized input, with TTL
+    and LRU size limits. A longer input can be answered by filtering the
+    predictions of a cached shorter prefix when that list was complete,
+    i.e. upstream returned fewer than `complete_below` predictions.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, complete_below: int, prefix_filter: bool = True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.complete_below = complete_below
+        self.prefix_filter = prefix_filter
+        self.hits = 0
+        self.prefix_hits = 0
+        self.misses = 0
+        self._root = _TrieNode()
+        self._lru: OrderedDict[str, None] = OrderedDict()
+
+    def _path(self, key: str) -> list[_TrieNode]:
+        """Nodes along `key`, stopping where the trie ends"""
+        nodes = [self._root]
+        for char in key:
+            node = nodes[-1].children.get(char)
+            if node is None:
+                break
+            nodes.append(node)
+        return nodes
+
+    def _live_entry(self, node: _TrieNode, key: str, now: float) -> list[dict] | None:
+        if node.entry is None:
+            return None
+        expires_at, predictions = node.entry
+        if expires_at <= now:
+            self._remove(key)
+            return None
+        return predictions
+
+    def get(self, query: str) -> list[dict] | None:
+        key = normalize_query(query)
+        now = time.monotonic()
+        path = self._path(key)
+
+        if len(path) == len(key) + 1:
+            predictions = self._live_entry(path[-1], key, now)
+            if predictions is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return predictions
+
+        if self.prefix_filter:
+            # Deepest cached ancestor first, its list is the most specific
+            for depth in range(min(len(path), len(key)) - 1, 0, -1):
+                prefix = key[:depth]
+                predictions = self._live_entry(path[depth], prefix, now)
+                if predictions is None or len(predictions) >= self.complete_below:
+                    continue
+                filtered = [p for p in predictions if prediction_matches(p, key)]
+                if filtered:
+                    self._lru.move_to_end(prefix)
+                    self.prefix_hits += 1
+                    return filtered
+
+        self.misses += 1
+        return None
+
+    def set(self, query: str, predictions: list[dict]) -> None:
+        key = normalize_query(query)
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+        node.entry = (time.monotonic() + self.ttl, predictions)
+
+        self._lru[key] = None
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._remove(next(iter(self._lru)))
+
+    def _remove(self, key: str) -> None:
+        self._lru.pop(key, None)
+        path = self._path(key)
+        if len(path) != len(key) + 1:
+            return
+        path[-1].entry = None
+
+        # Prune nodes that no longer lead to any entry
+        for depth in range(len(key), 0, -1):
+            node = path[depth]
+            if node.entry is not None or node.children:
+                break
+            del path[depth - 1].children[key[depth - 1]]
+
+    def clear(self) -> None:
+        self._root = _TrieNode()
+        self._lru.clear()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "prefix_hits": self.prefix_hits,
+            "misses": self.misses,
+            "size": len(self._lru),
+            "maxsize": self.maxsize,
+        }
@@ -0,0 +1,50 @@
+import hashlib
+import time
+
+from src.core.cache import TTLCache
+from src.schemas.user import UserResponse
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class PrincipalCache:
+    """
+    Authenticated users keyed by the SHA-256 of their access token, so raw
+    tokens are never held in memory. Entries never outlive the token.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._digests_by_user: dict[str, set[str]] = {}
+
+    def get(self, token: str) -> UserResponse | None:
+        return self._cache.get(token_digest(token))
+
+    def set(self, token: str, user: UserResponse, expires_at: float | None = None) -> None:
+        ttl = self._cache.ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+
+        digest = token_digest(token)
+        self._cache.set(digest, user, ttl=ttl)
+
+        # Drop digests the LRU already evicted before tracking the new one
+        digests = self._digests_by_user.get(user.user_username, set())
+        digests = {d for d in digests if d in self._cache}
+        digests.add(digest)
+        self._digests_by_user[user.user_username] = digests
+
+    def invalidate_token(self, token: str) -> None:
+        self._cache.pop(token_digest(token))
+
+    def invalidate_user(self, username: str) -> None:
+        """Call after changing a user's role or profile"""
+        for digest in self._digests_by_user.pop(username, set()):
+            self._cache.pop(digest)
+
+    def stats(self) -> dict[str, int]:
+        return self._cache.stats()
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Iterable
+
+import orjson
+
+from src.core.config import settings
+from src.core.metrics import registry, stats_gauge
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+# Queued in place of the messages dropped for a slow subscriber
+RESYNC = object()
+
+
+class Subscription:
+    """
+    Bounded queue of messages for one subscriber. When it fills up the
+    queued messages are dropped and a single RESYNC is delivered instead,
+    so a slow consumer costs memory once and then reloads current state.
+    """
+
+    def __init__(self, topics: Iterable[str], maxsize: int):
+        self.topics = frozenset(topics)
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._resync_pending = False
+
+    def put(self, message: Any) -> None:
+        if self._resync_pending:
+            self.dropped += 1
+            return
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.resync()
+            self.dropped += 1
+
+    def resync(self) -> None:
+        """Replace anything queued with a RESYNC"""
+        while not self._queue.empty():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._resync_pending = True
+        self._queue.put_nowait(RESYNC)
+
+    async def get(self, timeout: float) -> Any:
+        """Next message, RESYNC, or None when nothing arrived within `timeout`"""
+        try:
+            message = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if message is RESYNC:
+            self._resync_pending = False
+        return message
+
+
+class InMemoryBroker:
+    """Fans published messages out to this process's subscribers by topic"""
+
+    def __init__(self):
+        self.published = 0
+        self.delivered = 0
+        self._subscribers: dict[str, set[Subscription]] = defaultdict(set)
+        self._subscriptions: set[Subscription] = set()
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def subscribe(self, topics: Iterable[str], maxsize: int) -> Subscription:
+        subscription = Subscription(topics, maxsize)
+        self._subscriptions.add(subscription)
+        for topic in subscription.topics:
+            self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+        for topic in subscription.topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    async def publish(self, messages: list[tuple[str, Any]]) -> None:
+        """Publish (topic, message) pairs"""
+        self.deliver(messages)
+
+    def deliver(self, messages: list[tuple[str, Any]]) -> None:
+        self.published += len(messages)
+        for topic, message in messages:
+            for subscription in self._subscribers.get(topic, ()):
+                subscription.put(message)
+                self.delivered += 1
+
+    def resync_all(self) -> None:
+        """Tell every subscriber to reload, after messages may have been missed"""
+        for subscription in self._subscriptions:
+            subscription.resync()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "subscriptions": len(self._subscriptions),
+            "topics": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": sum(subscription.dropped for subscription in self._subscriptions),
+        }
+
+
+class RedisBroker(InMemoryBroker):
+    """
+    Publishes through a Redis channel so every worker delivers every
+    message to its own subscribers. Needs the optional redis package.
+    """
+
+    def __init__(self, url: str, channel: str):
+        if aioredis is None:
+            raise RuntimeError("PUBSUB_BACKEND=redis needs the redis package installed")
+        super().__init__()
+        self.channel = channel
+        self._redis = aioredis.from_url(url)
+        self._listener: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        await self._redis.aclose()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.deliver(orjson.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Redis pub/sub connection lost, resubscribing")
+                # Messages published while disconnected are gone
+                self.resync_all()
+                await asyncio.sleep(1)
+
+    async def publish(self, messages: list[tuple[str, Any]]) -> None:
+        if messages:
+            await self._redis.publish(self.channel, orjson.dumps(messages))
+
+
+broker: InMemoryBroker | None = None
+stats_gauge(
+    registry,
+    "walk_in_pubsub",
+    "Live walk-in update fan-out counters",
+    lambda: broker.stats() if broker is not None else {}
+)
+
+
+async def start_broker() -> InMemoryBroker:
+    """Create the configured broker, called from the app lifespan"""
+    global broker
+    if settings.PUBSUB_BACKEND == "redis":
+        broker = RedisBroker(settings.REDIS_URL, settings.PUBSUB_CHANNEL)
+    else:
+        broker = InMemoryBroker()
+    await broker.start()
+    return broker
+
+
+async def stop_broker() -> None:
+    global broker
+    if broker is not None:
+        await broker.stop()
+        broker = None
+
+
+def get_broker() -> InMemoryBroker:
+    if broker is None:
+        raise RuntimeError("Pub/sub broker is not started")
+    return broker
@@ -0,0 +1,176 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator
+
+from src.core.cache import TTLCache
+
+# Who is charged for upstream calls made while serving the current request
+quota_client: ContextVar[str] = ContextVar("quota_client", default="anonymous")
+
+
+class QuotaExceededError(Exception):
+    """Raised instead of calling Google when the upstream budget is spent"""
+
+    def __init__(self, reason: str, retry_after: float, client: str | None = None):
+        super().__init__(f"Google API budget exhausted ({reason}), retry in {retry_after:.0f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+        # The client whose own bucket was empty, None for global rejections
+        self.client = client
+
+
+def charged_to_other_client(e: BaseException) -> bool:
+    """
+    Whether `e` rejected a call for another client's empty bucket, as when
+    a coalesced call ran under the quota of the caller that started it
+    """
+    return (
+        isinstance(e, QuotaExceededError) and
+        e.client is not None and
+        e.client != quota_client.get()
+    )
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def wait_time(self, now: float, needed: float = 1) -> float:
+        """Seconds until `needed` tokens are available, 0 if they are now"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= needed:
+            return 0.0
+        return (needed - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def refund(self) -> None:
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class QuotaGovernor:
+    """
+    Admits an upstream call only if both the global and the caller's token
+    bucket have a token, then queues it for one of `max_concurrency` slots
+    for at most `queue_timeout` seconds. Rejections raise QuotaExceededError
+    immediately so callers can degrade instead of piling up.
+
+    `shared_clients` maps client names to their own (rate, burst), for
+    traffic such as tile fills that is charged to a shared bucket instead
+    of the caller's. Shared buckets never take the last `shared_reserve`
+    global tokens, which are kept for per-client traffic.
+    """
+
+    def __init__(
+        self,
+        global_rate: float,
+        global_burst: float,
+        client_rate: float,
+        client_burst: float,
+        max_concurrency: int,
+        queue_timeout: float,
+        max_clients: int = 10000,
+        shared_clients: dict[str, tuple[float, float]] | None = None,
+        shared_reserve: float = 0,
+    ):
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.queue_timeout = queue_timeout
+        self.shared_reserve = shared_reserve
+        self.admitted = 0
+        self.waiting = 0
+        self.running = 0
+        self.rejected = {"global": 0, "client": 0, "shared": 0, "busy": 0}
+        self._slots = asyncio.Semaphore(max_concurrency)
+        # An idle bucket is full again after burst / rate seconds and can be dropped
+        self._clients = TTLCache(maxsize=max_clients, ttl=client_burst / client_rate)
+        self._shared = {
+            client: TokenBucket(rate, burst)
+            for client, (rate, burst) in (shared_clients or {}).items()
+        }
+
+    def _reject(
+        self, reason: str, retry_after: float, client: str | None = None
+    ) -> QuotaExceededError:
+        self.rejected[reason] += 1
+        return QuotaExceededError(reason, retry_after, client)
+
+    def _bucket(self, client: str) -> tuple[TokenBucket, bool]:
+        """The bucket `client` is charged to and whether it is a shared one"""
+        bucket = self._shared.get(client)
+        if bucket is not None:
+            return bucket, True
+        bucket = self._clients.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.client_rate, self.client_burst)
+        self._clients.set(client, bucket)
+        return bucket, False
+
+    def available(self, client: str | None = None) -> float:
+        """Calls `client` could start right now without a global or client rejection"""
+        client = quota_client.get() if client is None else client
+        bucket, shared = self._bucket(client)
+        now = time.monotonic()
+        bucket.wait_time(now)
+        self.global_bucket.wait_time(now)
+        global_tokens = self.global_bucket.tokens - (self.shared_reserve if shared else 0)
+        return max(0.0, min(bucket.tokens, global_tokens))
+
+    @asynccontextmanager
+    async def slot(self, client: str | None = None) -> AsyncIterator[None]:
+        client = quota_client.get() if client is None else client
+        bucket, shared = self._bucket(client)
+
+        now = time.monotonic()
+        client_wait = bucket.wait_time(now)
+        if client_wait:
+            raise self._reject("shared" if shared else "client", client_wait, client)
+        global_wait = self.global_bucket.wait_time(
+            now, 1 + self.shared_reserve if shared else 1
+        )
+        if global_wait:
+            raise self._reject("global", global_wait)
+        bucket.take()
+        self.global_bucket.take()
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            # The call never went out, so it should not cost budget
+            bucket.refund()
+            self.global_bucket.refund()
+            raise self._reject("busy", self.queue_timeout)
+        finally:
+            self.waiting -= 1
+
+        self.admitted += 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "admitted": self.admitted,
+            "rejected_global": self.rejected["global"],
+            "rejected_client": self.rejected["client"],
+            "rejected_shared": self.rejected["shared"],
+            "rejected_busy": self.rejected["busy"],
+            "waiting": self.waiting,
+            "running": self.running,
+            "global_tokens": round(self.global_bucket.tokens, 2),
+            "clients": len(self._clients),
+        }
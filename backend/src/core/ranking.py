@@ -0,0 +1,100 @@
+from typing import Literal
+
+import numpy as np
+
+from src.core.spatial_index import EARTH_RADIUS_METERS
+
+SortOrder = Literal["distance", "rating", "score"]
+
+
+def haversine_meters_array(
+    lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray
+) -> np.ndarray:
+    """Great-circle distances in meters from one point to many"""
+    phi1, phi2 = np.radians(lat), np.radians(lats)
+    d_phi = phi2 - phi1
+    d_lambda = np.radians(lngs - lng)
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(a))
+
+
+def place_distances(places: list[dict], lat: float, lng: float) -> np.ndarray:
+    """Distance of every place payload from (lat, lng)"""
+    count = len(places)
+    lats = np.fromiter((place["location"]["latitude"] for place in places), float, count)
+    lngs = np.fromiter((place["location"]["longitude"] for place in places), float, count)
+    return haversine_meters_array(lat, lng, lats, lngs)
+
+
+def blended_scores(
+    ratings: np.ndarray,
+    review_counts: np.ndarray,
+    distances: np.ndarray,
+    radius: float,
+    prior_rating: float,
+    prior_reviews: float,
+    distance_weight: float,
+) -> np.ndarray:
+    """
+    Bayesian-average rating, so a 5.0 from three reviews does not beat a
+    4.7 from three thousand, blended with closeness to the search center
+    """
+    rated = ~np.isnan(ratings)
+    counts = np.where(rated, review_counts, 0)
+    weighted = prior_rating * prior_reviews + np.where(rated, ratings, 0) * counts
+    average = weighted / (prior_reviews + counts)
+    closeness = 1 - np.clip(distances / radius, 0, 1)
+    return (1 - distance_weight) * average / 5 + distance_weight * closeness
+
+
+def rank_places(
+    places: list[dict],
+    walk_in: list[bool],
+    distances: np.ndarray,
+    radius: float,
+    walk_in_only: bool = False,
+    min_rating: float | None = None,
+    min_review_count: int | None = None,
+    sort: SortOrder | None = None,
+    limit: int | None = None,
+    prior_rating: float = 4.0,
+    prior_reviews: float = 20,
+    distance_weight: float = 0.3,
+) -> np.ndarray:
+    """
+    Indices of the places that pass every filter, in response order, from
+    one pass over column arrays. Without `sort` the input order is kept.
+    """
+    count = len(places)
+    ratings = np.fromiter(
+        (np.nan if place.get("rating") is None else place["rating"] for place in places),
+        float,
+        count,
+    )
+    review_counts = np.fromiter(
+        (place.get("userRatingCount") or 0 for place in places), float, count
+    )
+
+    mask = np.ones(count, dtype=bool)
+    if walk_in_only:
+        mask &= np.fromiter(walk_in, bool, count)
+    if min_rating is not None:
+        mask &= ratings >= min_rating  # unrated places never match
+    if min_review_count is not None:
+        mask &= review_counts >= min_review_count
+
+    if sort == "distance":
+        order = np.argsort(distances, kind="stable")
+    elif sort == "rating":
+        # Highest rating first, unrated last, nearer first on ties
+        order = np.lexsort((distances, -np.nan_to_num(ratings, nan=-1)))
+    elif sort == "score":
+        scores = blended_scores(
+            ratings, review_counts, distances, radius,
+            prior_rating, prior_reviews, distance_weight,
+        )
+        order = np.argsort(-scores, kind="stable")
+    else:
+        order = np.arange(count)
+
+    return order[mask[order]][:limit]
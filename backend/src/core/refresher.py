@@ -0,0 +1,154 @@
+import asyncio
+import heapq
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable
+
+from src.core.google_client import CircuitOpenError
+from src.core.quota import QuotaExceededError, quota_client
+
+logger = logging.getLogger(__name__)
+
+
+class HotKeyTracker:
+    """
+    Request frequency per key with exponential decay, so a key's score is
+    roughly its request count over the last `half_life` seconds
+    """
+
+    def __init__(self, half_life: float, maxsize: int):
+        self.decay = math.log(2) / half_life
+        self.maxsize = maxsize
+        self._scores: dict[Hashable, tuple[float, float]] = {}
+
+    def _score(self, key: Hashable, now: float) -> float:
+        score, updated = self._scores[key]
+        return score * math.exp(-self.decay * (now - updated))
+
+    def record(self, key: Hashable) -> None:
+        now = time.monotonic()
+        score = self._score(key, now) if key in self._scores else 0.0
+        self._scores[key] = (score + 1, now)
+        if len(self._scores) > self.maxsize:
+            # Keep the hotter half rather than evicting on every insert
+            keep = self.top(self.maxsize // 2)
+            self._scores = {key: (score, now) for key, score in keep}
+
+    def top(self, n: int, min_score: float = 0) -> list[tuple[Hashable, float]]:
+        """The `n` hottest keys with their current scores, hottest first"""
+        now = time.monotonic()
+        scored = ((key, self._score(key, now)) for key in self._scores)
+        return heapq.nlargest(
+            n, (item for item in scored if item[1] >= min_score), key=lambda item: item[1]
+        )
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+@dataclass
+class RefreshSource:
+    """A cache the refresher keeps warm for its hottest keys"""
+    name: str
+    tracker: HotKeyTracker
+    needs_refresh: Callable[[Hashable], bool]
+    refresh: Callable[[Hashable], Awaitable[Any]]
+
+
+class BackgroundRefresher:
+    """
+    Every `interval` seconds (plus or minus `jitter` of it), re-fetches the
+    hottest keys of each source that are about to expire. At most `budget`
+    refreshes run per cycle, `concurrency` at a time, and their Google
+    calls are charged to their own quota client.
+    """
+
+    def __init__(
+        self,
+        sources: list[RefreshSource],
+        interval: float,
+        jitter: float,
+        top_n: int,
+        min_score: float,
+        budget: int,
+        concurrency: int,
+    ):
+        self.sources = sources
+        self.interval = interval
+        self.jitter = jitter
+        self.top_n = top_n
+        self.min_score = min_score
+        self.budget = budget
+        self.concurrency = concurrency
+        self.cycles = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.deferred = 0
+        self._task: asyncio.Task | None = None
+
+    def candidates(self) -> list[tuple[float, RefreshSource, Hashable]]:
+        """Keys due for a refresh across all sources, hottest first"""
+        due = []
+        for source in self.sources:
+            for key, score in source.tracker.top(self.top_n, self.min_score):
+                if source.needs_refresh(key):
+                    due.append((score, source, key))
+        due.sort(key=lambda item: item[0], reverse=True)
+        return due
+
+    async def run_cycle(self) -> None:
+        due = self.candidates()
+        self.deferred += max(len(due) - self.budget, 0)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def refresh(source: RefreshSource, key: Hashable) -> None:
+            async with semaphore:
+                try:
+                    await source.refresh(key)
+                    self.refreshed += 1
+                except (QuotaExceededError, CircuitOpenError):
+                    # User traffic has priority on what budget is left, retry next cycle
+                    self.deferred += 1
+                except Exception:
+                    self.failed += 1
+                    logger.exception("Background refresh of %s %r failed", source.name, key)
+
+        await asyncio.gather(*(refresh(source, key) for _, source, key in due[:self.budget]))
+        self.cycles += 1
+
+    async def _run(self) -> None:
+        quota_client.set("background-refresh")
+        while True:
+            await asyncio.sleep(self.interval * random.uniform(1 - self.jitter, 1 + self.jitter))
+            try:
+                await self.run_cycle()
+            except Exception:
+                logger.exception("Background refresh cycle failed")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        stats = {
+            "cycles": self.cycles,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "deferred": self.deferred,
+        }
+        for source in self.sources:
+            stats[f"tracked_{source.name}"] = len(source.tracker)
+        return stats
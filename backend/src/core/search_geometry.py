@@ -0,0 +1,126 @@
+import math
+import re
+
+from src.core.config import settings
+from src.core.spatial_index import METERS_PER_DEGREE_LAT
+
+# Selangor and KL boundaries (approximate)
+SELANGOR_KL_BOUNDS = {
+    "north": 3.4500,   # Northern Selangor
+    "south": 2.6000,   # Southern Selangor
+    "east": 102.0000,  # Eastern boundary
+    "west": 101.0000   # Western boundary
+}
+
+MAX_SEARCH_RADIUS = 50000
+MAX_RESULT_COUNT = 20
+EXCLUDED_KEYWORDS = ["hotel", "resort", "park", "field", "playground", "garden"]
+# One scan of each name instead of one substring search per keyword
+EXCLUDED_KEYWORDS_PATTERN = re.compile(
+    "|".join(re.escape(word) for word in EXCLUDED_KEYWORDS), re.IGNORECASE
+)
+
+NEARBY_FIELD_MASK = (
+    "places.id,"
+    "places.displayName,"
+    "places.formattedAddress,"
+    "places.location,"
+    "places.rating,"
+    "places.userRatingCount,"
+    "places.googleMapsUri,"
+    "places.websiteUri,"
+    "places.photos,"
+    "places.nationalPhoneNumber,"
+)
+
+
+def is_within_selangor_kl(lat: float, lng: float) -> bool:
+    """Check if coordinates are within Selangor/KL region"""
+    return (
+        SELANGOR_KL_BOUNDS["south"] <= lat <= SELANGOR_KL_BOUNDS["north"] and
+        SELANGOR_KL_BOUNDS["west"] <= lng <= SELANGOR_KL_BOUNDS["east"]
+    )
+
+
+def nearby_search_payload(lat: float, lng: float, radius: int) -> dict:
+    return {
+        "includedTypes": ["gym", "fitness_center"],
+        "maxResultCount": MAX_RESULT_COUNT,
+        "locationRestriction": {
+            "circle": {
+                "center": {
+                    "latitude": lat,
+                    "longitude": lng
+                },
+                "radius": radius
+            }
+        }
+    }
+
+
+def filter_gym_places(data: dict) -> list[dict]:
+    """Raw searchNearby place payloads that pass the keyword and Selangor/KL filters"""
+    places = []
+
+    for place in data.get("places", []):
+        location = place.get("location", {})
+        lat = location.get("latitude")
+        lng = location.get("longitude")
+        name = place.get("displayName", {}).get("text", "")
+
+        if EXCLUDED_KEYWORDS_PATTERN.search(name):
+            continue
+
+        # Filter: Only include gyms within Selangor/KL
+        if lat and lng and is_within_selangor_kl(lat, lng):
+            places.append(place)
+
+    return places
+
+
+def sweep_circles(lat: float, lng: float, radius: int) -> list[tuple[float, float, int]]:
+    """
+    Cover a circle with hex-packed sub-circles. With k rings of hexagons
+    whose circumradius is s, the union contains a disk of radius 1.5 * k * s.
+    """
+    min_sub_radius = settings.NEARBY_SWEEP_MIN_SUB_RADIUS_METERS
+    if radius <= min_sub_radius:
+        return [(lat, lng, radius)]
+
+    rings = max(1, min(
+        settings.NEARBY_SWEEP_MAX_RINGS, math.floor(radius / (1.5 * min_sub_radius))
+    ))
+    sub_radius = math.ceil(radius / (1.5 * rings))
+    spacing = math.sqrt(3) * sub_radius
+    meters_per_degree_lng = METERS_PER_DEGREE_LAT * math.cos(math.radians(lat))
+
+    circles = []
+    for q in range(-rings, rings + 1):
+        for r in range(max(-rings, -q - rings), min(rings, -q + rings) + 1):
+            x = spacing * (q + r / 2)
+            y = spacing * r * math.sqrt(3) / 2
+            # Skip sub-circles that do not reach the requested circle
+            if math.hypot(x, y) - sub_radius > radius:
+                continue
+            circles.append((
+                lat + y / METERS_PER_DEGREE_LAT,
+                lng + x / meters_per_degree_lng,
+                sub_radius
+            ))
+    return circles
+
+
+def split_circle(lat: float, lng: float, radius: int) -> list[tuple[float, float, int]]:
+    """Seven hex-packed circles covering the circle, as sweep_circles does with one ring"""
+    sub_radius = math.ceil(radius / 1.5)
+    spacing = math.sqrt(3) * sub_radius
+    meters_per_degree_lng = METERS_PER_DEGREE_LAT * math.cos(math.radians(lat))
+    circles = [(lat, lng, sub_radius)]
+    for k in range(6):
+        angle = k * math.pi / 3
+        circles.append((
+            lat + spacing * math.sin(angle) / METERS_PER_DEGREE_LAT,
+            lng + spacing * math.cos(angle) / meters_per_degree_lng,
+            sub_radius
+        ))
+    return circles
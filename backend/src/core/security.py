@@ -1,14 +1,16 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Any, Callable, TypeVar
 from src.core.config import settings
+from src.core.metrics import registry, stats_gauge
 from passlib.context import CryptContext
+from fastapi import HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 
-
-SECRET_KEY = settings.SECRET_KEY
-ALGORITHM = settings.ALGORITHM
-ACCESS_TOKEN_EXPIRES_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
-
+T = TypeVar("T")
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -23,6 +25,98 @@ def get_password_hash(password: str):
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded thread pool so it never blocks the event loop.
+    bcrypt releases the GIL while hashing, so threads run in parallel.
+    Callers wait at most `queue_timeout` seconds for a slot, then get a 503.
+    The pool is started on first use and again after shutdown, so a second
+    app lifespan in the same process (tests, src.bench) can still hash.
+    """
+
+    def __init__(self, max_workers: int, queue_timeout: float):
+        self.max_workers = max_workers
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds = 0.0
+        self._slots = asyncio.Semaphore(max_workers)
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="bcrypt"
+            )
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, please retry",
+                headers={"Retry-After": str(max(int(self.queue_timeout), 1))}
+            )
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.hash_seconds += time.perf_counter() - start
+            self.completed += 1
+            self.running -= 1
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        # The next lifespan may run on another event loop
+        self._slots = asyncio.Semaphore(self.max_workers)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "waiting": self.waiting,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "hash_seconds": self.hash_seconds,
+        }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS
+)
+stats_gauge(
+    registry, "password_hasher", "bcrypt pool queue depth and timings", password_hasher.stats
+)
+
+
+def user_claims(user) -> dict:
+    """JWT claims for a user, including a profile snapshot in stateless mode"""
+    claims = {"sub": user.user_username}
+    if settings.AUTH_STATELESS_CLAIMS:
+        claims.update({
+            "uid": user.user_id,
+            "role": user.user_role.value,
+            "email": user.user_email,
+            "age": user.user_age,
+            "gender": user.user_gender.value,
+        })
+    return claims
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     if expires_delta:
@@ -32,7 +126,7 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
 
     to_encode.update({"exp" : expire})
 
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
     return encoded_jwt
 
@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one in-flight task.
+
+    The shared task is shielded, so a caller that is cancelled (for example
+    a disconnected client) stops waiting without cancelling the call for
+    the other waiters.
+
+    An error for which `rerun` returns True is not shared: a waiter that
+    joined the call runs `fn` again itself, for errors that belong to the
+    caller that started it rather than to the call.
+    """
+
+    def __init__(self, rerun: Callable[[BaseException], bool] | None = None):
+        self.rerun = rerun
+        self.calls = 0
+        self.coalesced = 0
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the error as retrieved when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        Run `fn` unless a call for `key` is already in flight, and return
+        its result plus whether it was shared with an earlier caller.
+        """
+        task = self._tasks.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        try:
+            return await asyncio.shield(task), shared
+        except Exception as e:
+            if not shared or self.rerun is None or not self.rerun(e):
+                raise
+        # In a task of its own, as the first run was, with this caller's context
+        return await asyncio.ensure_future(fn()), False
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._tasks),
+        }
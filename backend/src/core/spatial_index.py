@@ -0,0 +1,136 @@
+import math
+import time
+from collections import defaultdict
+from typing import Hashable, Iterable
+
+EARTH_RADIUS_METERS = 6371000
+METERS_PER_DEGREE_LAT = 111320
+
+
+def haversine_meters(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two coordinates in meters"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(a))
+
+
+def _degree_spans(lat: float, radius: float) -> tuple[float, float]:
+    """Latitude/longitude half-widths of the bounding box around a circle"""
+    lat_span = radius / METERS_PER_DEGREE_LAT
+    lng_span = radius / (METERS_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+    return lat_span, lng_span
+
+
+class GridIndex:
+    """Uniform lat/lng grid over items, answering radius queries"""
+
+    def __init__(self, cell_degrees: float):
+        self.cell_degrees = cell_degrees
+        self._cells: dict[tuple[int, int], set[Hashable]] = defaultdict(set)
+
+    def cell(self, lat: float, lng: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees)
+
+    def cells_in_radius(self, lat: float, lng: float, radius: float) -> Iterable[tuple[int, int]]:
+        lat_span, lng_span = _degree_spans(lat, radius)
+        min_i, min_j = self.cell(lat - lat_span, lng - lng_span)
+        max_i, max_j = self.cell(lat + lat_span, lng + lng_span)
+        for i in range(min_i, max_i + 1):
+            for j in range(min_j, max_j + 1):
+                yield i, j
+
+    def add(self, cell: tuple[int, int], item: Hashable) -> None:
+        self._cells[cell].add(item)
+
+    def discard(self, cell: tuple[int, int], item: Hashable) -> None:
+        items = self._cells.get(cell)
+        if items is not None:
+            items.discard(item)
+            if not items:
+                del self._cells[cell]
+
+    def items_in(self, cell: tuple[int, int]) -> set[Hashable]:
+        return self._cells.get(cell, set())
+
+
+class PlaceIndex:
+    """
+    In-memory store of place payloads with a grid index over their
+    coordinates, plus the searched areas that are known to be fresh.
+    """
+
+    def __init__(self, cell_degrees: float, area_cell_degrees: float, fresh_seconds: float):
+        self.fresh_seconds = fresh_seconds
+        self._places: dict[str, dict] = {}
+        self._place_cells: dict[str, tuple[int, int]] = {}
+        self._grid = GridIndex(cell_degrees)
+        # Covered areas are registered in every coarse cell their circle touches
+        self._areas: dict[Hashable, tuple[float, float, float, float]] = {}
+        self._area_grid = GridIndex(area_cell_degrees)
+
+    def __len__(self) -> int:
+        return len(self._places)
+
+    def upsert(self, places: Iterable[dict]) -> None:
+        for place in places:
+            place_id = place["id"]
+            location = place["location"]
+            cell = self._grid.cell(location["latitude"], location["longitude"])
+
+            old_cell = self._place_cells.get(place_id)
+            if old_cell is not None and old_cell != cell:
+                self._grid.discard(old_cell, place_id)
+
+            self._places[place_id] = place
+            self._place_cells[place_id] = cell
+            self._grid.add(cell, place_id)
+
+    def get(self, place_id: str) -> dict | None:
+        return self._places.get(place_id)
+
+    def query(self, lat: float, lng: float, radius: float) -> list[dict]:
+        """Places within `radius` meters of (lat, lng), nearest first"""
+        matches = []
+        for cell in self._grid.cells_in_radius(lat, lng, radius):
+            for place_id in self._grid.items_in(cell):
+                place = self._places[place_id]
+                location = place["location"]
+                distance = haversine_meters(lat, lng, location["latitude"], location["longitude"])
+                if distance <= radius:
+                    matches.append((distance, place))
+
+        matches.sort(key=lambda match: match[0])
+        return [place for _, place in matches]
+
+    def mark_fresh(
+        self,
+        area_key: Hashable,
+        lat: float,
+        lng: float,
+        radius: float,
+        refreshed_at: float | None = None,
+    ) -> None:
+        """Record that every place in this circle was fetched at `refreshed_at`"""
+        refreshed_at = time.time() if refreshed_at is None else refreshed_at
+        if area_key not in self._areas:
+            for cell in self._area_grid.cells_in_radius(lat, lng, radius):
+                self._area_grid.add(cell, area_key)
+        self._areas[area_key] = (lat, lng, radius, refreshed_at)
+
+    def is_fresh(
+        self, lat: float, lng: float, radius: float, max_age: float | None = None
+    ) -> bool:
+        """
+        True if an area searched within `max_age` seconds (default
+        `fresh_seconds`) fully contains this circle
+        """
+        oldest = time.time() - (self.fresh_seconds if max_age is None else max_age)
+        for area_key in self._area_grid.items_in(self._area_grid.cell(lat, lng)):
+            area_lat, area_lng, area_radius, refreshed_at = self._areas[area_key]
+            if refreshed_at < oldest:
+                continue
+            if haversine_meters(lat, lng, area_lat, area_lng) + radius <= area_radius:
+                return True
+        return False
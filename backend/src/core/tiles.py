@@ -0,0 +1,66 @@
+import math
+
+from src.core.spatial_index import haversine_meters
+
+
+def tile_latitude(y: int, z: int) -> float:
+    """Latitude of the top edge of tile row `y` at zoom `z`"""
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / 2 ** z))))
+
+
+def tile_bounds(z: int, x: int, y: int) -> dict[str, float]:
+    """Edges of a Web-Mercator slippy-map tile, keyed like SELANGOR_KL_BOUNDS"""
+    n = 2 ** z
+    return {
+        "north": tile_latitude(y, z),
+        "south": tile_latitude(y + 1, z),
+        "east": (x + 1) / n * 360 - 180,
+        "west": x / n * 360 - 180,
+    }
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def bounds_contain(bounds: dict[str, float], lat: float, lng: float) -> bool:
+    """Half-open on the north and east edges so neighbouring tiles never share a place"""
+    return (
+        bounds["south"] <= lat < bounds["north"] and
+        bounds["west"] <= lng < bounds["east"]
+    )
+
+
+def bounds_intersect(a: dict[str, float], b: dict[str, float]) -> bool:
+    return (
+        a["south"] < b["north"] and b["south"] < a["north"] and
+        a["west"] < b["east"] and b["west"] < a["east"]
+    )
+
+
+def bounds_circle(bounds: dict[str, float]) -> tuple[float, float, int]:
+    """Center and radius in meters of a circle covering the whole box"""
+    lat = (bounds["north"] + bounds["south"]) / 2
+    lng = (bounds["east"] + bounds["west"]) / 2
+    radius = max(
+        haversine_meters(lat, lng, corner_lat, corner_lng)
+        for corner_lat in (bounds["north"], bounds["south"])
+        for corner_lng in (bounds["east"], bounds["west"])
+    )
+    return lat, lng, math.ceil(radius)
+
+
+def descendant_tiles(z: int, x: int, y: int, zoom: int) -> list[tuple[int, int, int]]:
+    """Tiles at the deeper `zoom` that together cover tile (z, x, y)"""
+    scale = 2 ** (zoom - z)
+    return [
+        (zoom, x * scale + dx, y * scale + dy)
+        for dx in range(scale)
+        for dy in range(scale)
+    ]
+
+
+def ancestor_tile(z: int, x: int, y: int, zoom: int) -> tuple[int, int, int]:
+    """Tile at the shallower `zoom` containing tile (z, x, y)"""
+    shift = z - zoom
+    return zoom, x >> shift, y >> shift
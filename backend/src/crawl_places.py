@@ -0,0 +1,392 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from datetime import datetime
+from typing import Any
+
+from src.core.config import settings
+from src.core.google_client import GOOGLE_ERRORS, CircuitOpenError, GoogleClient
+from src.core.quota import TokenBucket
+from src.core.search_geometry import (
+    MAX_RESULT_COUNT,
+    MAX_SEARCH_RADIUS,
+    NEARBY_FIELD_MASK,
+    SELANGOR_KL_BOUNDS,
+    filter_gym_places,
+    nearby_search_payload,
+    split_circle,
+)
+from src.core.spatial_index import METERS_PER_DEGREE_LAT, haversine_meters
+from src.core.tiles import bounds_circle
+from src.db import places_repository
+from src.db.database import AsyncSessionLocal, dispose_engine
+
+Circle = tuple[float, float, int]
+
+# Recorded once a crawl finishes, so every search inside Selangor/KL is
+# answered from t_places until the area goes stale
+COVERAGE_AREA_KEY = "crawl:selangor-kl"
+
+
+def circle_reaches_bounds(lat: float, lng: float, radius: int, bounds: dict[str, float]) -> bool:
+    nearest_lat = min(max(lat, bounds["south"]), bounds["north"])
+    nearest_lng = min(max(lng, bounds["west"]), bounds["east"])
+    return haversine_meters(lat, lng, nearest_lat, nearest_lng) <= radius
+
+
+def grid_circles(bounds: dict[str, float], radius: int) -> list[Circle]:
+    """Hex-packed circles of `radius` whose union covers the whole box"""
+    lat_step = 1.5 * radius / METERS_PER_DEGREE_LAT
+    circles = []
+    row = 0
+    lat = bounds["south"] - lat_step
+    while lat < bounds["north"] + lat_step:
+        lng_step = math.sqrt(3) * radius / (METERS_PER_DEGREE_LAT * math.cos(math.radians(lat)))
+        # Every other row is shifted by half a step
+        lng = bounds["west"] - lng_step * (1 + row % 2 / 2)
+        while lng < bounds["east"] + lng_step:
+            if circle_reaches_bounds(lat, lng, radius, bounds):
+                circles.append((lat, lng, radius))
+            lng += lng_step
+        lat += lat_step
+        row += 1
+    return circles
+
+
+def load_checkpoint(path: str) -> dict | None:
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path: str, state: dict) -> None:
+    # Write then rename so an interruption never leaves half a checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(state, file)
+    os.replace(tmp_path, path)
+
+
+def new_state(radius: int) -> dict[str, Any]:
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "pending": grid_circles(SELANGOR_KL_BOUNDS, radius),
+        "place_ids": [],
+        "calls": 0,
+        "failed": 0,
+        "split": 0,
+        "saturated": 0,
+        "elapsed": 0.0,
+    }
+
+
+class Crawler:
+    """
+    Works through a frontier of search circles, `concurrency` calls at a
+    time and at most `rate` calls per second. A circle that comes back with
+    a full page may hold more gyms than Google returned, so it is replaced
+    by smaller circles until a page is not full or `min_radius` is reached.
+
+    Places are upserted in chunks of `chunk_size`, and the frontier is
+    checkpointed every `checkpoint_every` circles, always after the places
+    of every circle it no longer lists have been committed.
+    """
+
+    def __init__(
+        self,
+        google: GoogleClient,
+        state: dict[str, Any],
+        checkpoint_path: str,
+        concurrency: int,
+        rate: float,
+        min_radius: int,
+        chunk_size: int,
+        checkpoint_every: int,
+        max_calls: int | None,
+        max_failures: int,
+    ):
+        self.google = google
+        self.checkpoint_path = checkpoint_path
+        self.concurrency = concurrency
+        self.min_radius = min_radius
+        self.chunk_size = chunk_size
+        self.checkpoint_every = checkpoint_every
+        self.max_calls = max_calls
+        self.max_failures = max_failures
+
+        self.started_at = state["started_at"]
+        self.pending: set[Circle] = {tuple(circle) for circle in state["pending"]}
+        self.place_ids: set[str] = set(state["place_ids"])
+        self.calls = state["calls"]
+        self.failed = state["failed"]
+        self.split = state["split"]
+        self.saturated = state["saturated"]
+        self.previous_elapsed = state["elapsed"]
+
+        self.run_calls = 0
+        self.run_failed = 0
+        self.completed = 0
+        self.error: Exception | None = None
+        self._bucket = TokenBucket(rate, 1)
+        self._places: dict[str, dict] = {}
+        self._areas: list[dict] = []
+        self._save_lock = asyncio.Lock()
+        self._stopped = asyncio.Event()
+        self._run_started = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        return self.previous_elapsed + time.monotonic() - self._run_started
+
+    async def _acquire(self) -> None:
+        while wait := self._bucket.wait_time(time.monotonic()):
+            await asyncio.sleep(wait)
+        self._bucket.take()
+
+    async def crawl(self, queue: asyncio.Queue, circle: Circle) -> None:
+        if self.max_calls is not None and self.run_calls >= self.max_calls:
+            # Out of budget for this run, the circle stays in the checkpoint
+            self._stopped.set()
+            return
+        self.run_calls += 1
+        await self._acquire()
+
+        lat, lng, radius = circle
+        try:
+            data = await self.google.search_nearby(
+                nearby_search_payload(lat, lng, radius), NEARBY_FIELD_MASK
+            )
+        except CircuitOpenError as e:
+            # Nothing went out, wait for the breaker and try again
+            self.run_calls -= 1
+            await asyncio.sleep(e.retry_after)
+            queue.put_nowait(circle)
+            return
+        except GOOGLE_ERRORS as e:
+            self.calls += 1
+            self.failed += 1
+            self.run_failed += 1
+            print(f"searchNearby failed for {circle}: {e!r}")
+            if self.run_failed > self.max_failures:
+                self._stopped.set()
+            else:
+                queue.put_nowait(circle)
+            return
+        self.calls += 1
+
+        places = filter_gym_places(data)
+        self.place_ids.update(place["id"] for place in places)
+        self._places.update((place["id"], place) for place in places)
+
+        if len(data.get("places", [])) >= MAX_RESULT_COUNT:
+            if radius > self.min_radius:
+                self.split += 1
+                for child in split_circle(lat, lng, radius):
+                    if circle_reaches_bounds(*child, SELANGOR_KL_BOUNDS):
+                        self.pending.add(child)
+                        queue.put_nowait(child)
+            else:
+                self.saturated += 1
+        else:
+            self._areas.append({
+                "area_key": f"crawl:{lat:.5f},{lng:.5f},{radius}",
+                "latitude": lat,
+                "longitude": lng,
+                "radius": radius
+            })
+        self.pending.discard(circle)
+        self.completed += 1
+
+        if len(self._places) >= self.chunk_size:
+            await self.save(checkpoint=False)
+        if self.completed % self.checkpoint_every == 0:
+            await self.save()
+
+    async def save(self, checkpoint: bool = True) -> None:
+        """Upsert buffered places and crawled areas, then optionally checkpoint"""
+        async with self._save_lock:
+            # Snapshot first: anything finished while the upsert runs is
+            # still listed as pending, so it is crawled again on resume
+            # rather than lost
+            places = list(self._places.values())
+            areas = self._areas
+            self._places = {}
+            self._areas = []
+            state = self.state()
+
+            refreshed_at = datetime.now()
+            async with AsyncSessionLocal() as db:
+                for start in range(0, len(places), self.chunk_size):
+                    await places_repository.upsert_place_details(
+                        db, places[start:start + self.chunk_size], refreshed_at
+                    )
+                for start in range(0, len(areas), self.chunk_size):
+                    await places_repository.mark_areas_refreshed(
+                        db, areas[start:start + self.chunk_size], refreshed_at
+                    )
+                await db.commit()
+
+            if checkpoint:
+                save_checkpoint(self.checkpoint_path, state)
+                print(
+                    f"{self.calls} calls, {len(self.place_ids)} places, "
+                    f"{len(self.pending)} circles left"
+                )
+
+    async def worker(self, queue: asyncio.Queue) -> None:
+        while not self._stopped.is_set():
+            circle = await queue.get()
+            try:
+                await self.crawl(queue, circle)
+            except Exception as e:
+                self.error = e
+                self._stopped.set()
+            finally:
+                queue.task_done()
+
+    async def run(self) -> bool:
+        """Crawl until the frontier is empty or the run stops, True if it emptied"""
+        queue: asyncio.Queue = asyncio.Queue()
+        for circle in self.pending:
+            queue.put_nowait(circle)
+
+        workers = [asyncio.create_task(self.worker(queue)) for _ in range(self.concurrency)]
+        drained = asyncio.create_task(queue.join())
+        stopped = asyncio.create_task(self._stopped.wait())
+        try:
+            await asyncio.wait({drained, stopped}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (*workers, drained, stopped):
+                task.cancel()
+            await asyncio.gather(*workers, drained, stopped, return_exceptions=True)
+            await self.save()
+
+        if self.error is not None:
+            raise self.error
+        return not self.pending
+
+    async def finish(self) -> None:
+        """Record Selangor/KL as fully crawled and drop the finished checkpoint"""
+        if self.saturated:
+            print(
+                f"{self.saturated} circles still returned a full page at the minimum "
+                "radius, not marking Selangor/KL as fully crawled"
+            )
+        else:
+            lat, lng, radius = bounds_circle(SELANGOR_KL_BOUNDS)
+            async with AsyncSessionLocal() as db:
+                await places_repository.mark_areas_refreshed(db, [{
+                    "area_key": COVERAGE_AREA_KEY,
+                    "latitude": lat,
+                    "longitude": lng,
+                    # Contains every search the API accepts that is centered inside the box
+                    "radius": radius + MAX_SEARCH_RADIUS,
+                }], datetime.now())
+                await db.commit()
+        os.remove(self.checkpoint_path)
+
+    def state(self) -> dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "pending": sorted(self.pending),
+            "place_ids": sorted(self.place_ids),
+            "calls": self.calls,
+            "failed": self.failed,
+            "split": self.split,
+            "saturated": self.saturated,
+            "elapsed": round(self.elapsed, 1),
+        }
+
+    def summary(self, complete: bool) -> str:
+        status = "complete" if complete else f"stopped, {len(self.pending)} circles left"
+        return (
+            f"Crawl {status} (started {self.started_at})\n"
+            f"calls: {self.calls} ({self.failed} failed, {self.run_calls} this run)\n"
+            f"places found: {len(self.place_ids)}\n"
+            f"circles split: {self.split}, still full at minimum radius: {self.saturated}\n"
+            f"elapsed: {self.elapsed:.1f}s"
+        )
+
+
+async def main(args: argparse.Namespace) -> bool:
+    if not settings.DATABASE_URL:
+        raise RuntimeError("DATABASE_URL must be set in environment")
+
+    if not settings.GOOGLE_PLACES_API_KEY:
+        raise RuntimeError("GOOGLE_PLACES_API_KEY must be set in environment")
+
+    state = None if args.restart else load_checkpoint(args.checkpoint)
+    if state is None:
+        state = new_state(args.radius)
+        save_checkpoint(args.checkpoint, state)
+    else:
+        print(f"Resuming crawl started {state['started_at']} from {args.checkpoint}")
+
+    # The crawler paces itself, so it does not draw on the app's quota governor
+    google = GoogleClient(api_key=settings.GOOGLE_PLACES_API_KEY)
+    crawler = Crawler(
+        google,
+        state,
+        checkpoint_path=args.checkpoint,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        min_radius=args.min_radius,
+        chunk_size=args.chunk_size,
+        checkpoint_every=args.checkpoint_every,
+        max_calls=args.max_calls,
+        max_failures=args.max_failures,
+    )
+    complete = False
+    try:
+        complete = await crawler.run()
+        if complete:
+            await crawler.finish()
+    finally:
+        await google.aclose()
+        await dispose_engine()
+        print(crawler.summary(complete))
+    return complete or crawler.run_failed <= args.max_failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Crawl every gym in Selangor/KL from Google Places into t_places"
+    )
+    parser.add_argument(
+        "--checkpoint", default="crawl_checkpoint.json",
+        help="json file tracking progress, resumed from if it exists",
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore an existing checkpoint and start over"
+    )
+    parser.add_argument(
+        "--radius", type=int, default=5000,
+        help="radius in meters of the initial grid circles",
+    )
+    parser.add_argument(
+        "--min-radius", type=int, default=250,
+        help="smallest radius a circle with a full page of results is split down to",
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=5, help="searchNearby calls per second")
+    parser.add_argument(
+        "--max-calls", type=int, help="stop after this many calls and resume on the next run"
+    )
+    parser.add_argument(
+        "--max-failures", type=int, default=20,
+        help="stop once this many calls in a run have failed after retries",
+    )
+    parser.add_argument("--chunk-size", type=int, default=500, help="rows per upsert statement")
+    parser.add_argument(
+        "--checkpoint-every", type=int, default=50,
+        help="circles crawled between checkpoints",
+    )
+    args = parser.parse_args()
+
+    if not asyncio.run(main(args)):
+        raise SystemExit(1)
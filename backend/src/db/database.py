@@ -1,24 +1,58 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+from functools import lru_cache
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from src.core.config import settings
+from src.db.instrumentation import TimedQueuePool, instrument_engine
 
-SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
-
-# Create async engine
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=False  # Set to True for debugging
-)
-
-# Create async session factory
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False
-)
-
-Base = declarative_base()
\ No newline at end of file
+# The one declarative base, shared by every model
+Base = declarative_base()
+
+
+@lru_cache
+def get_engine() -> AsyncEngine:
+    """Create the async engine on first use, so importing the app needs no database"""
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        poolclass=TimedQueuePool,
+        echo=False  # Set to True for debugging
+    )
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+@lru_cache
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        get_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False
+    )
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """New session on the lazily created engine"""
+    return get_sessionmaker()()
+
+
+async def warm_pool(connections: int) -> None:
+    """Open pooled connections up front so the first requests skip the handshake"""
+    engine = get_engine()
+
+    async def ping() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(ping() for _ in range(connections)))
+
+
+async def dispose_engine() -> None:
+    if get_engine.cache_info().currsize:
+        await get_engine().dispose()
+        get_sessionmaker.cache_clear()
+        get_engine.cache_clear()
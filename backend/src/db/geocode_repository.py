@@ -0,0 +1,40 @@
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import GeocodeCache
+
+
+async def get_geocode(db: AsyncSession, address_key: str) -> GeocodeCache | None:
+    """Cached geocode for a normalized address, ignoring expired negative entries"""
+    result = await db.execute(
+        select(GeocodeCache).where(GeocodeCache.address_key == address_key)
+    )
+    entry = result.scalar_one_or_none()
+    if entry and entry.expires_at and entry.expires_at <= datetime.now():
+        return None
+    return entry
+
+
+async def upsert_geocode(
+    db: AsyncSession,
+    address_key: str,
+    status: str,
+    lat: float | None,
+    lng: float | None,
+    expires_at: datetime | None = None,
+) -> None:
+    values = {
+        "address_key": address_key,
+        "status": status,
+        "latitude": lat,
+        "longitude": lng,
+        "refreshed_at": datetime.now(),
+        "expires_at": expires_at,
+    }
+    stmt = insert(GeocodeCache).values(values)
+    stmt = stmt.on_duplicate_key_update(
+        {column: stmt.inserted[column] for column in values if column != "address_key"}
+    )
+    await db.execute(stmt)
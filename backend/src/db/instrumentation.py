@@ -0,0 +1,161 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.core.metrics import DB_POOL_CHECKOUT_WAIT, DB_QUERY_DURATION
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
+logger = logging.getLogger(__name__)
+
+# Placeholder lists such as IN (%s, %s, %s), then numeric literals
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|\?|:\w+)\s*,)+\s*(?:%s|\?|:\w+)\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement with whitespace, IN-list lengths and numbers normalized away"""
+    shape = " ".join(statement.split())
+    shape = _PLACEHOLDER_LIST.sub("(...)", shape)
+    return _NUMBER.sub("N", shape)
+
+
+class QueryTrace:
+    """Statements run while the trace is active, counted by shape"""
+
+    def __init__(self, parent: "QueryTrace | None" = None):
+        self.parent = parent
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        shape = statement_shape(statement)
+        trace = self
+        while trace is not None:
+            trace.count += 1
+            trace.seconds += seconds
+            trace.shapes[shape] += 1
+            trace = trace.parent
+
+    def repeated(self) -> list[tuple[str, int]]:
+        """Shapes run more than once, most frequent first. Often an N+1."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > 1]
+
+    def report(self) -> str:
+        lines = [f"{self.count} queries in {self.seconds * 1000:.1f} ms"]
+        lines.extend(f"  {n}x {shape}" for shape, n in self.shapes.most_common())
+        return "\n".join(lines)
+
+
+_current_trace: ContextVar[QueryTrace | None] = ContextVar("query_trace", default=None)
+
+
+@contextmanager
+def trace_queries() -> Iterator[QueryTrace]:
+    """
+    Trace the statements run in this context, including tasks it starts.
+    Traces nest: statements count towards every enclosing trace.
+    """
+    trace = QueryTrace(parent=_current_trace.get())
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryTrace]:
+    """
+    Test helper failing when the block runs more than `limit` statements:
+
+        with assert_max_queries(4):
+            response = await client.get("/places/nearby-gyms", params=params)
+    """
+    with trace_queries() as trace:
+        yield trace
+    if trace.count > limit:
+        raise AssertionError(f"expected at most {limit} queries, got {trace.report()}")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_times"].pop()
+    DB_QUERY_DURATION.observe(elapsed)
+    # SQLAlchemy's async greenlets run with the awaiting task's context
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(statement, elapsed)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Record query time for every statement run on the (sync) engine"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryTraceMiddleware:
+    """
+    Pure ASGI middleware tracing each request's statements. Adds query
+    count and DB time as X-DB-* and Server-Timing headers and logs a
+    summary with any repeated statement shapes. For debugging only.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with trace_queries() as trace:
+            async def send_wrapper(message):
+                # Statements run after the headers are sent only reach the log
+                if message["type"] == "http.response.start":
+                    message["headers"] = [*message.get("headers", []), *(
+                        (name.encode(), value.encode()) for name, value in (
+                            ("x-db-query-count", str(trace.count)),
+                            ("x-db-time-ms", f"{trace.seconds * 1000:.1f}"),
+                            ("x-db-repeated-statements", str(len(trace.repeated()))),
+                            ("server-timing", f"db;dur={trace.seconds * 1000:.1f}"),
+                        )
+                    )]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                logger.info(
+                    "%s %s: %d queries, %.1f ms in db",
+                    scope["method"], scope["path"], trace.count, trace.seconds * 1000,
+                    extra={
+                        "db_query_count": trace.count,
+                        "db_time_ms": round(trace.seconds * 1000, 1),
+                        "db_repeated_statements": trace.repeated(),
+                    }
+                )
+                for shape, n in trace.repeated():
+                    logger.info("  repeated %dx: %s", n, shape)
@@ -1,11 +1,11 @@
-from sqlalchemy import Boolean, Enum, Integer, String
-from sqlalchemy.orm import declarative_base, Mapped, mapped_column
+from datetime import datetime
+from sqlalchemy import JSON, Boolean, DateTime, Enum, Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.mysql import TINYINT
 
+from src.db.database import Base
 from src.schemas.user import Gender, UserRole
 
-Base = declarative_base()
-
 class User(Base):
     __tablename__ = "t_user"
 
@@ -35,4 +35,51 @@ class Places(Base):
     )
     walk_in : Mapped[bool] = mapped_column(
         Boolean, default=True, nullable=False
-    )
\ No newline at end of file
+    )
+
+    # Place details cached from Google, NULL until first fetched
+    display_name : Mapped[str | None] = mapped_column(String(255))
+    formatted_address : Mapped[str | None] = mapped_column(String(255))
+    latitude : Mapped[float | None] = mapped_column(Float)
+    longitude : Mapped[float | None] = mapped_column(Float)
+    rating : Mapped[float | None] = mapped_column(Float)
+    user_rating_count : Mapped[int | None] = mapped_column(Integer)
+    google_maps_uri : Mapped[str | None] = mapped_column(String(255))
+    website_uri : Mapped[str | None] = mapped_column(String(512))
+    national_phone_number : Mapped[str | None] = mapped_column(String(30))
+    photos : Mapped[list[str] | None] = mapped_column(JSON)  # photo resource names
+    refreshed_at : Mapped[datetime | None] = mapped_column(DateTime, index=True)
+
+
+class SearchArea(Base):
+    """A nearby search circle whose places were all fetched at refreshed_at"""
+    __tablename__ = "t_search_areas"
+    id : Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=True
+    )
+    area_key : Mapped[str] = mapped_column(
+        String(64), unique=True, nullable=False
+    )
+    latitude : Mapped[float] = mapped_column(Float, nullable=False)
+    longitude : Mapped[float] = mapped_column(Float, nullable=False)
+    radius : Mapped[int] = mapped_column(Integer, nullable=False)
+    refreshed_at : Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, index=True
+    )
+
+
+class GeocodeCache(Base):
+    """Geocoding result for a normalized address, shared across workers"""
+    __tablename__ = "t_geocode_cache"
+    id : Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=True
+    )
+    address_key : Mapped[str] = mapped_column(
+        String(255), unique=True, nullable=False
+    )
+    status : Mapped[str] = mapped_column(String(20), nullable=False)
+    latitude : Mapped[float | None] = mapped_column(Float)
+    longitude : Mapped[float | None] = mapped_column(Float)
+    refreshed_at : Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # NULL for positive results, which do not expire
+    expires_at : Mapped[datetime | None] = mapped_column(DateTime)
\ No newline at end of file
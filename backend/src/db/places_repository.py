@@ -0,0 +1,185 @@
+from datetime import datetime
+from typing import AsyncIterator, Iterable
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import Places, SearchArea
+
+DETAIL_COLUMNS = (
+    "display_name",
+    "formatted_address",
+    "latitude",
+    "longitude",
+    "rating",
+    "user_rating_count",
+    "google_maps_uri",
+    "website_uri",
+    "national_phone_number",
+    "photos",
+    "refreshed_at",
+)
+
+
+def place_detail_values(place: dict, refreshed_at: datetime) -> dict:
+    """Map a Google place payload onto t_places columns"""
+    location = place.get("location", {})
+    return {
+        "places_id": place["id"],
+        "display_name": place.get("displayName", {}).get("text"),
+        "formatted_address": place.get("formattedAddress"),
+        "latitude": location.get("latitude"),
+        "longitude": location.get("longitude"),
+        "rating": place.get("rating"),
+        "user_rating_count": place.get("userRatingCount"),
+        "google_maps_uri": place.get("googleMapsUri"),
+        "website_uri": place.get("websiteUri"),
+        "national_phone_number": place.get("nationalPhoneNumber"),
+        "photos": [photo["name"] for photo in place.get("photos", []) if photo.get("name")],
+        "refreshed_at": refreshed_at,
+    }
+
+
+def place_payload(place: Places) -> dict:
+    """Rebuild the Google place payload shape from a stored t_places row"""
+    return {
+        "id": place.places_id,
+        "displayName": {"text": place.display_name},
+        "formattedAddress": place.formatted_address,
+        "location": {"latitude": place.latitude, "longitude": place.longitude},
+        "rating": place.rating,
+        "userRatingCount": place.user_rating_count,
+        "googleMapsUri": place.google_maps_uri,
+        "websiteUri": place.website_uri,
+        "nationalPhoneNumber": place.national_phone_number,
+        "photos": [{"name": name} for name in place.photos or []],
+    }
+
+
+async def get_places_by_ids(db: AsyncSession, place_ids: Iterable[str]) -> dict[str, Places]:
+    """Fetch every known place in a single IN (...) query, keyed by places_id"""
+    place_ids = list(dict.fromkeys(place_ids))
+    if not place_ids:
+        return {}
+
+    result = await db.execute(
+        select(Places).where(Places.places_id.in_(place_ids))
+    )
+    return {place.places_id: place for place in result.scalars()}
+
+
+async def insert_missing_places(db: AsyncSession, place_ids: Iterable[str]) -> None:
+    """
+    Insert default rows for unseen places in one statement.
+    ON DUPLICATE KEY makes concurrent inserts of the same places_id a no-op.
+    """
+    rows = [{"places_id": place_id, "walk_in": True} for place_id in dict.fromkeys(place_ids)]
+    if not rows:
+        return
+
+    stmt = insert(Places).values(rows)
+    stmt = stmt.on_duplicate_key_update(places_id=stmt.inserted.places_id)
+    await db.execute(stmt)
+
+
+async def get_walk_in_statuses(db: AsyncSession, place_ids: Iterable[str]) -> dict[str, bool]:
+    """
+    Walk-in status for a whole result set, registering unseen places.
+    Costs one SELECT plus at most one INSERT regardless of result size.
+    """
+    place_ids = list(dict.fromkeys(place_ids))
+    existing = await get_places_by_ids(db, place_ids)
+
+    missing = [place_id for place_id in place_ids if place_id not in existing]
+    await insert_missing_places(db, missing)
+
+    statuses = {place_id: True for place_id in missing}  # default value
+    statuses.update({place_id: place.walk_in for place_id, place in existing.items()})
+    return statuses
+
+
+async def upsert_walk_in(db: AsyncSession, place_id: str, walk_in: bool) -> Places:
+    """Set walk-in status for a place, creating it if needed"""
+    stmt = insert(Places).values(places_id=place_id, walk_in=walk_in)
+    stmt = stmt.on_duplicate_key_update(walk_in=stmt.inserted.walk_in)
+    await db.execute(stmt)
+
+    result = await db.execute(
+        select(Places)
+        .where(Places.places_id == place_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+async def bulk_upsert_walk_in(db: AsyncSession, rows: list[dict]) -> None:
+    """Apply many (places_id, walk_in) rows in a single statement"""
+    if not rows:
+        return
+
+    stmt = insert(Places).values(rows)
+    stmt = stmt.on_duplicate_key_update(walk_in=stmt.inserted.walk_in)
+    await db.execute(stmt)
+
+
+async def stream_walk_in(db: AsyncSession, batch_size: int) -> AsyncIterator[tuple[str, bool]]:
+    """Every (places_id, walk_in) pair through a server-side cursor"""
+    result = await db.stream(
+        select(Places.places_id, Places.walk_in)
+        .order_by(Places.id)
+        .execution_options(yield_per=batch_size)
+    )
+    async for places_id, walk_in in result:
+        yield places_id, walk_in
+
+
+async def upsert_place_details(
+    db: AsyncSession, places: list[dict], refreshed_at: datetime
+) -> None:
+    """Store Google details for a batch of places in one statement, keeping walk_in"""
+    if not places:
+        return
+
+    stmt = insert(Places).values(
+        [place_detail_values(place, refreshed_at) for place in places]
+    )
+    stmt = stmt.on_duplicate_key_update(
+        {column: stmt.inserted[column] for column in DETAIL_COLUMNS}
+    )
+    await db.execute(stmt)
+
+
+async def mark_areas_refreshed(
+    db: AsyncSession, areas: list[dict], refreshed_at: datetime
+) -> None:
+    """Record fetched search circles (area_key, latitude, longitude, radius) in one statement"""
+    if not areas:
+        return
+
+    stmt = insert(SearchArea).values(
+        [{**area, "refreshed_at": refreshed_at} for area in areas]
+    )
+    # The circle for a key can change with the cache settings, so it is updated too
+    stmt = stmt.on_duplicate_key_update({
+        column: stmt.inserted[column]
+        for column in ("latitude", "longitude", "radius", "refreshed_at")
+    })
+    await db.execute(stmt)
+
+
+async def get_stored_places(db: AsyncSession) -> list[Places]:
+    """Every place with stored details, for loading the spatial index"""
+    result = await db.execute(
+        select(Places).where(
+            Places.latitude.is_not(None),
+            Places.longitude.is_not(None)
+        )
+    )
+    return list(result.scalars())
+
+
+async def get_fresh_areas(db: AsyncSession, since: datetime) -> list[SearchArea]:
+    result = await db.execute(
+        select(SearchArea).where(SearchArea.refreshed_at >= since)
+    )
+    return list(result.scalars())
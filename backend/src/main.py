@@ -1,11 +1,38 @@
+import asyncio
+import contextlib
+import logging
 from typing import Union
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from src.routers import places, user, auth
 from src.core.config import settings
 from contextlib import asynccontextmanager
 from src.db.models import Base
-from src.db.database import engine
+from src.db.database import dispose_engine, get_engine, warm_pool
+from src.core.google_client import stop_google_client
+from src.core.pubsub import start_broker, stop_broker
+from src.core.security import password_hasher
+from src.core.metrics import MetricsMiddleware, registry
+from src.core.compression import SelectiveCompressionMiddleware
+from src.db.instrumentation import QueryTraceMiddleware
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up(app: FastAPI) -> None:
+    """Fill the DB pool and load stored places, then report ready"""
+    while True:
+        try:
+            await warm_pool(settings.DB_WARM_CONNECTIONS)
+            await places.load_place_index()
+            break
+        except Exception:
+            logger.exception("Warm-up failed, retrying in %ss", settings.WARMUP_RETRY_SECONDS)
+            await asyncio.sleep(settings.WARMUP_RETRY_SECONDS)
+    app.state.ready = True
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
 
@@ -14,19 +41,52 @@ async def lifespan(app: FastAPI):
 
     if not settings.DATABASE_URL:
         raise RuntimeError("DATABASE_URL must be set in environment")
-    
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
 
-    yield
+    if not settings.GOOGLE_PLACES_API_KEY:
+        raise RuntimeError("GOOGLE_PLACES_API_KEY must be set in environment")
+
+    if settings.DB_CREATE_ALL:
+        async with get_engine().begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    # Serve /health straight away, /ready once warm
+    app.state.ready = False
+    warm_up_task = asyncio.create_task(warm_up(app))
+    await start_broker()
+    if settings.REFRESH_ENABLED:
+        places.refresher.start()
+    try:
+        yield
+    finally:
+        warm_up_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await warm_up_task
+        await places.refresher.stop()
+        await stop_broker()
+        await stop_google_client()
+        password_hasher.shutdown()
+        await dispose_engine()
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 origins = ["http://localhost:5173",  "https://fitfinder-frontend.onrender.com"]
 
 @app.api_route("/health", methods=["GET", "HEAD"])
 def health_check():
     return {"status": "healthy"}
 
+@app.api_route("/ready", methods=["GET", "HEAD"])
+def readiness_check():
+    """503 until the DB pool and in-process caches are warm"""
+    if not getattr(app.state, "ready", False):
+        return ORJSONResponse({"status": "warming up"}, status_code=503)
+    return {"status": "ready"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4"
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -35,6 +95,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Streams must flush per event and images are already compressed
+app.add_middleware(
+    SelectiveCompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    skip_prefixes=(
+        "/places/nearby-gyms/stream", "/places/gyms/walk-in/stream", "/places/photos/"
+    ),
+)
+
+# Outside compression so its headers survive re-encoding
+if settings.SQL_TRACE_ENABLED:
+    app.add_middleware(QueryTraceMiddleware)
+
+# Added last so it wraps every other middleware
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth.router)
 app.include_router(user.router)
 app.include_router(places.router)
@@ -1,17 +1,20 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, Response, HTTPException, status
+from typing import Annotated
+from fastapi import APIRouter, Cookie, Depends, Response, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from src.core.config import settings
 from src.core.security import (
-    ACCESS_TOKEN_EXPIRES_MINUTES,
     create_access_token,
     get_password_hash,
+    password_hasher,
+    user_claims,
     verify_password,
 )
 from src.db.models import User
-from src.core.dependencies import get_db
+from src.core.dependencies import get_db, principal_cache
 from src.schemas.user import UserCreate, UserWithToken
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -24,7 +27,7 @@ def set_cookie(response: Response, access_token: str):
         value=access_token,
         httponly=True,
         secure=True,  # Change to True in HTTPS
-        max_age=ACCESS_TOKEN_EXPIRES_MINUTES * 60,
+        max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
         samesite="none",
         path="/",
     )
@@ -53,7 +56,7 @@ async def register(
         )
 
     # Hash and create new user
-    hashed_password = get_password_hash(user.user_password)
+    hashed_password = await password_hasher.run(get_password_hash, user.user_password)
     new_user = User(
         user_username=user.user_username,
         user_password=hashed_password,
@@ -69,8 +72,8 @@ async def register(
 
     # Generate JWT
     access_token = create_access_token(
-        data={"sub": new_user.user_username},
-        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRES_MINUTES),
+        data=user_claims(new_user),
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
     )
 
     set_cookie(response, access_token)
@@ -97,7 +100,9 @@ async def login(
     )
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(form_data.password, user.user_password):
+    if not user or not await password_hasher.run(
+        verify_password, form_data.password, user.user_password
+    ):
         raise HTTPException(
             status_code=401,
             detail=[{"msg": "Incorrect username or password"}]
@@ -105,8 +110,8 @@ async def login(
 
     # Create JWT token
     access_token = create_access_token(
-        data={"sub": user.user_username},
-        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRES_MINUTES),
+        data=user_claims(user),
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
     )
 
     set_cookie(response, access_token)
@@ -114,8 +119,13 @@ async def login(
 
 
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(
+    response: Response,
+    access_token: Annotated[str | None, Cookie(alias="access_token")] = None
+):
     """Logout user by deleting cookie"""
+    if access_token:
+        principal_cache.invalidate_token(access_token)
     response.delete_cookie(
         key="access_token",
         httponly=True,
@@ -1,175 +1,1006 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 import httpx
-import certifi
 from src.core.dependencies import get_current_admin_user, get_db
-from src.db.models import Places, User
+from src.db import geocode_repository, places_repository
 from src.core.config import settings
+from src.core.google_client import (
+    GOOGLE_ERRORS,
+    TILES_QUOTA_CLIENT,
+    CircuitOpenError,
+    GoogleClient,
+    get_google_client,
+    photo_quota_governor,
+    quota_governor
+)
 
+from src.schemas.user import UserResponse
 from src.schemas.places import (
     NearbyGymsRequest,
     NearbyGymsResponse,
     PlaceResponse,
     PlaceLocationResponse,
     UpdateWalkInRequest,
-    PlaceInDB
+    PlaceInDB,
+    BulkWalkInRequest,
+    BulkWalkInResponse
 )
-import urllib.parse
-import httpx
-import certifi
-router = APIRouter(prefix="/places", tags=["Places"])
-
-# Selangor and KL boundaries (approximate)
-SELANGOR_KL_BOUNDS = {
-    "north": 3.4500,   # Northern Selangor
-    "south": 2.6000,   # Southern Selangor
-    "east": 102.0000,  # Eastern boundary
-    "west": 101.0000   # Western boundary
-}
+from src.core.cache import TTLCache
+from src.core.http_cache import cacheable_json_response, etag_matches
+from src.core.metrics import registry, stats_gauge
+from src.core.photo_cache import PhotoDiskCache, PhotoEntry
+from src.core.prefix_cache import PrefixCache, normalize_query
+from src.core.pubsub import RESYNC, get_broker
+from src.core.quota import QuotaExceededError, charged_to_other_client, quota_client
+from src.core.ranking import SortOrder, place_distances, rank_places
+from src.core.refresher import BackgroundRefresher, HotKeyTracker, RefreshSource
+from src.core.search_geometry import (
+    MAX_RESULT_COUNT,
+    MAX_SEARCH_RADIUS,
+    NEARBY_FIELD_MASK,
+    SELANGOR_KL_BOUNDS,
+    filter_gym_places,
+    is_within_selangor_kl,
+    nearby_search_payload,
+    split_circle,
+    sweep_circles
+)
+from src.core.singleflight import SingleFlight
+from src.core.spatial_index import METERS_PER_DEGREE_LAT, PlaceIndex, haversine_meters
+from src.core.tiles import (
+    ancestor_tile,
+    bounds_circle,
+    bounds_contain,
+    bounds_intersect,
+    descendant_tiles,
+    is_valid_tile,
+    tile_bounds
+)
+from src.db.database import AsyncSessionLocal
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Iterable, Literal
+import asyncio
+import base64
+import codecs
+import csv
+import hashlib
+import json
+import logging
+import math
+import numpy as np
+import orjson
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def client_address(http_request: Request) -> str | None:
+    """
+    The caller's address. Behind TRUSTED_PROXY_COUNT proxies it is the
+    entry the outermost one appended to X-Forwarded-For, since anything
+    further left was sent by the caller and can be forged.
+    """
+    proxies = settings.TRUSTED_PROXY_COUNT
+    if proxies:
+        forwarded = [
+            address.strip()
+            for address in http_request.headers.get("X-Forwarded-For", "").split(",")
+            if address.strip()
+        ]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return http_request.client.host if http_request.client else None
+
+
+async def charge_quota_to_client(http_request: Request) -> None:
+    """Charge Google calls made for this request to the caller's address"""
+    address = client_address(http_request)
+    if address:
+        quota_client.set(address)
+
+
+router = APIRouter(
+    prefix="/places",
+    tags=["Places"],
+    dependencies=[Depends(charge_quota_to_client)]
+)
+
+# Already-filtered Google payloads keyed by grid cell and radius bucket.
+# Walk-in status is not cached, it is read from t_places on every response.
+nearby_cache = TTLCache(
+    maxsize=settings.NEARBY_CACHE_MAX_ENTRIES,
+    ttl=settings.NEARBY_CACHE_TTL_SECONDS
+)
+
+# Cache keys whose last upstream search came back with a full page, so
+# the area may hold more gyms than were returned
+full_nearby_areas = TTLCache(
+    maxsize=settings.NEARBY_CACHE_MAX_ENTRIES,
+    ttl=settings.PLACES_AREA_FRESH_SECONDS
+)
+
+# Stored place details, answers searches inside areas fetched recently
+place_index = PlaceIndex(
+    cell_degrees=settings.PLACES_INDEX_CELL_DEGREES,
+    area_cell_degrees=settings.PLACES_AREA_CELL_DEGREES,
+    fresh_seconds=settings.PLACES_AREA_FRESH_SECONDS
+)
+
+# Predictions keyed by normalized input, shorter prefixes answer longer ones
+autocomplete_cache = PrefixCache(
+    maxsize=settings.AUTOCOMPLETE_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTOCOMPLETE_CACHE_TTL_SECONDS,
+    complete_below=settings.AUTOCOMPLETE_COMPLETE_BELOW,
+    prefix_filter=settings.AUTOCOMPLETE_PREFIX_FILTER
+)
+
+# (status, lat, lng) per normalized address, in front of t_geocode_cache
+geocode_cache = TTLCache(
+    maxsize=settings.GEOCODE_L1_MAX_ENTRIES,
+    ttl=settings.GEOCODE_L1_TTL_SECONDS
+)
+
+# Last good predictions per query, served when the Google budget is spent
+autocomplete_fallback = TTLCache(
+    maxsize=settings.AUTOCOMPLETE_CACHE_MAX_ENTRIES,
+    ttl=settings.QUOTA_STALE_MAX_AGE_SECONDS
+)
+
+# Filtered place payloads per map tile at TILE_FILL_ZOOM
+tile_cache = TTLCache(
+    maxsize=settings.TILE_CACHE_MAX_ENTRIES,
+    ttl=settings.TILE_CACHE_TTL_SECONDS
+)
+
+# Concurrent identical Google calls share one in-flight request. It runs
+# under the quota of the caller that started it, so a waiter is never
+# handed that caller's "slow down" and retries under its own quota instead.
+upstream_flight = SingleFlight(rerun=charged_to_other_client)
+
+# Request frequency per nearby cache key and per normalized address
+nearby_hot_keys = HotKeyTracker(
+    half_life=settings.REFRESH_HOT_HALF_LIFE_SECONDS,
+    maxsize=settings.REFRESH_TRACKED_KEYS
+)
+geocode_hot_keys = HotKeyTracker(
+    half_life=settings.REFRESH_HOT_HALF_LIFE_SECONDS,
+    maxsize=settings.REFRESH_TRACKED_KEYS
+)
+
+# Photo bytes on disk, created on first use
+photo_cache: PhotoDiskCache | None = None
+PHOTO_NAME_PATTERN = re.compile(r"^places/[\w-]+/photos/[\w-]+$")
+PHOTO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+stats_gauge(registry, "nearby_cache", "Nearby gyms cache counters", nearby_cache.stats)
+stats_gauge(registry, "autocomplete_cache", "Autocomplete cache counters", autocomplete_cache.stats)
+stats_gauge(registry, "geocode_cache", "Geocode L1 cache counters", geocode_cache.stats)
+stats_gauge(registry, "tile_cache", "Map tile cache counters", tile_cache.stats)
+stats_gauge(registry, "upstream_singleflight", "Coalesced upstream calls", upstream_flight.stats)
+stats_gauge(
+    registry, "photo_cache", "Photo disk cache counters", lambda: get_photo_cache().stats()
+)
+registry.gauge_func(
+    "place_index_places", "Places in the spatial index", (), lambda: [((), len(place_index))]
+)
+
+def is_over_budget(e: Exception) -> bool:
+    """Errors where serving stored results beats failing the request"""
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code == 429
+    return isinstance(e, (QuotaExceededError, CircuitOpenError))
+
+def retry_after_header(seconds: float) -> dict[str, str]:
+    return {"Retry-After": str(max(math.ceil(seconds), 1))}
+
+def google_http_exception(e: Exception) -> HTTPException:
+    """Translate a Google client error into the HTTP error returned to our client"""
+    if isinstance(e, QuotaExceededError):
+        # Only a caller over its own budget is told it sent too many requests
+        return HTTPException(
+            status_code=429 if e.reason == "client" else 503,
+            detail="Too many searches, please slow down" if e.reason == "client"
+            else "Search capacity exhausted, please retry",
+            headers=retry_after_header(e.retry_after)
+        )
+    if isinstance(e, CircuitOpenError):
+        return HTTPException(
+            status_code=503,
+            detail="Google API temporarily unavailable",
+            headers=retry_after_header(e.retry_after)
+        )
+    if isinstance(e, httpx.HTTPStatusError) and e.response.status_code == 429:
+        retry_after = e.response.headers.get("Retry-After", "")
+        return HTTPException(
+            status_code=503,
+            detail="Google API quota exceeded",
+            headers=retry_after_header(float(retry_after) if retry_after.isdigit() else 1)
+        )
+    if isinstance(e, httpx.HTTPStatusError):
+        return HTTPException(
+            status_code=e.response.status_code,
+            detail=f"Google API error: {e.response.text}"
+        )
+    return HTTPException(status_code=500, detail=f"Request error: {e}")
+
+
+def nearby_cache_key(lat: float, lng: float, radius: int) -> tuple[int, int, int]:
+    """Quantize a search into a grid cell plus a radius bucket"""
+    cell = settings.NEARBY_CACHE_CELL_DEGREES
+    bucket = settings.NEARBY_CACHE_RADIUS_BUCKET_METERS
+    radius_bucket = min(math.ceil(radius / bucket) * bucket, MAX_SEARCH_RADIUS)
+    return math.floor(lat / cell), math.floor(lng / cell), radius_bucket
+
+
+def area_key_str(key: tuple[int, int, int]) -> str:
+    return ":".join(str(part) for part in key)
+
+
+def nearby_cache_search_area(key: tuple[int, int, int]) -> tuple[float, float, int]:
+    """
+    Center and radius of the upstream search that fills a cache key. The
+    radius is padded by the cell's half-diagonal so the circle contains
+    every search centered in the cell with a radius up to the bucket.
+    """
+    cell = settings.NEARBY_CACHE_CELL_DEGREES
+    lat_index, lng_index, radius = key
+    padding = math.ceil(cell * math.sqrt(2) / 2 * METERS_PER_DEGREE_LAT)
+    return (
+        (lat_index + 0.5) * cell,
+        (lng_index + 0.5) * cell,
+        min(radius + padding, MAX_SEARCH_RADIUS)
+    )
+
+
+async def fetch_nearby_places(
+    google: GoogleClient, lat: float, lng: float, radius: int
+) -> tuple[list[dict], bool]:
+    """
+    Call Google Places searchNearby and return the raw place payloads
+    that pass the keyword and Selangor/KL filters, plus whether Google
+    returned a full page before filtering
+    """
+    data = await google.search_nearby(
+        nearby_search_payload(lat, lng, radius), NEARBY_FIELD_MASK
+    )
+    return filter_gym_places(data), len(data.get("places", [])) >= MAX_RESULT_COUNT
+
+
+async def load_place_index() -> None:
+    """
+    Load stored places and search areas into the spatial index, including
+    areas old enough only to be served stale
+    """
+    since = datetime.now() - timedelta(seconds=settings.QUOTA_STALE_MAX_AGE_SECONDS)
+    async with AsyncSessionLocal() as db:
+        stored_places = await places_repository.get_stored_places(db)
+        fresh_areas = await places_repository.get_fresh_areas(db, since)
+
+    place_index.upsert(places_repository.place_payload(place) for place in stored_places)
+    for area in fresh_areas:
+        place_index.mark_fresh(
+            area.area_key,
+            area.latitude,
+            area.longitude,
+            area.radius,
+            area.refreshed_at.timestamp()
+        )
+
+
+async def fetch_nearby_area(
+    google: GoogleClient, cache_key: tuple[int, int, int]
+) -> list[dict]:
+    """
+    Fetch an area from Google into the response cache and spatial index.
+    Runs inside the single-flight, so it must not touch a caller's session.
+    """
+    lat, lng, radius = nearby_cache_search_area(cache_key)
+    places_data, full = await fetch_nearby_places(google, lat, lng, radius)
+
+    if full:
+        full_nearby_areas.set(cache_key, True)
+    else:
+        full_nearby_areas.pop(cache_key)
+    place_index.upsert(places_data)
+    place_index.mark_fresh(area_key_str(cache_key), lat, lng, radius)
+    nearby_cache.set(cache_key, places_data)
+    return places_data
+
+
+async def store_nearby_areas(
+    db: AsyncSession, fetched: dict[tuple[int, int, int], list[dict]]
+) -> None:
+    """Persist fetched areas to t_places and t_search_areas in two statements"""
+    if not fetched:
+        return
+
+    refreshed_at = datetime.now()
+    places_by_id = {
+        place["id"]: place for places_data in fetched.values() for place in places_data
+    }
+    areas = []
+    for cache_key in fetched:
+        lat, lng, radius = nearby_cache_search_area(cache_key)
+        areas.append({
+            "area_key": area_key_str(cache_key),
+            "latitude": lat,
+            "longitude": lng,
+            "radius": radius
+        })
+    await places_repository.upsert_place_details(db, list(places_by_id.values()), refreshed_at)
+    await places_repository.mark_areas_refreshed(db, areas, refreshed_at)
+
+
+async def get_nearby_place_payloads(
+    google: GoogleClient,
+    lat: float,
+    lng: float,
+    radius: int,
+    fetched: dict[tuple[int, int, int], list[dict]],
+    stale: set[tuple[int, int, int]]
+) -> list[dict]:
+    """
+    Filtered place payloads for a search, from the response cache, then
+    the spatial index when the area is fresh, then Google. Areas this
+    caller fetched are added to `fetched` for store_nearby_areas, so
+    concurrent sub-searches never share the request's session. When the
+    Google budget is spent, an area searched before is served from the
+    index and added to `stale`.
+    """
+    # Searches in the same grid cell and radius bucket share one upstream call
+    cache_key = nearby_cache_key(lat, lng, radius)
+    nearby_hot_keys.record(cache_key)
+    places_data = nearby_cache.get(cache_key)
+    if places_data is not None:
+        return places_data
+
+    area = nearby_cache_search_area(cache_key)
+    if place_index.is_fresh(*area):
+        return place_index.query(*area)[:MAX_RESULT_COUNT]
 
-def is_within_selangor_kl(lat: float, lng: float) -> bool:
-    """Check if coordinates are within Selangor/KL region"""
+    try:
+        places_data, shared = await upstream_flight.do(
+            ("nearby", cache_key), lambda: fetch_nearby_area(google, cache_key)
+        )
+    except GOOGLE_ERRORS as e:
+        if is_over_budget(e) and place_index.is_fresh(
+            *area, max_age=settings.QUOTA_STALE_MAX_AGE_SECONDS
+        ):
+            stale.add(cache_key)
+            return place_index.query(*area)[:MAX_RESULT_COUNT]
+        raise google_http_exception(e)
+    # Only the caller that started the fetch writes it to the database
+    if not shared:
+        fetched[cache_key] = places_data
+    return places_data
+
+
+def clip_to_radius(
+    places_data: list[dict], lat: float, lng: float, radius: int
+) -> list[dict]:
+    """Places within `radius` of the search center, in their original order"""
+    distances = place_distances(places_data, lat, lng)
+    return [place for place, distance in zip(places_data, distances) if distance <= radius]
+
+
+def is_full_page(circle: tuple[float, float, int], places_data: list[dict]) -> bool:
+    """Whether a sub-search may have been cut off at Google's result limit"""
     return (
-        SELANGOR_KL_BOUNDS["south"] <= lat <= SELANGOR_KL_BOUNDS["north"] and
-        SELANGOR_KL_BOUNDS["west"] <= lng <= SELANGOR_KL_BOUNDS["east"]
+        len(places_data) >= MAX_RESULT_COUNT or
+        nearby_cache_key(*circle) in full_nearby_areas
+    )
+
+
+async def sweep_nearby_place_payloads(
+    google: GoogleClient,
+    lat: float,
+    lng: float,
+    radius: int,
+    fetched: dict[tuple[int, int, int], list[dict]],
+    stale: set[tuple[int, int, int]],
+    truncated: set[tuple[float, float, int]]
+) -> list[dict]:
+    """
+    Query overlapping sub-circles concurrently so dense areas are not cut
+    off at Google's 20-result limit. A sub-circle that comes back full is
+    split into seven smaller ones, down to NEARBY_SWEEP_MIN_SPLIT_RADIUS_METERS,
+    within NEARBY_SWEEP_MAX_SEARCHES and only while the caller's quota keeps
+    NEARBY_SWEEP_SPLIT_RESERVE calls spare. Circles that are still full, or
+    whose split was refused by the quota, are added to `truncated`.
+    Deduped by place id, nearest first.
+    """
+    semaphore = asyncio.Semaphore(settings.NEARBY_SWEEP_CONCURRENCY)
+
+    async def search(
+        circle: tuple[float, float, int], parent: tuple[float, float, int] | None
+    ) -> tuple[tuple[float, float, int], list[dict]]:
+        async with semaphore:
+            try:
+                return circle, await get_nearby_place_payloads(
+                    google, *circle, fetched, stale
+                )
+            except HTTPException:
+                if parent is None:
+                    raise
+                # A split only adds detail to its parent's page, so a
+                # rejected one marks the parent truncated instead of failing
+                truncated.add(parent)
+                return circle, []
+
+    pending = [(circle, None) for circle in sweep_circles(lat, lng, radius)]
+    searches = 0
+    results = []
+    while pending:
+        searches += len(pending)
+        batch = await asyncio.gather(*(search(circle, parent) for circle, parent in pending))
+        pending = []
+        # Splits must not spend the calls the caller's next requests need
+        split_budget = (
+            math.inf if google.governor is None else google.governor.available()
+        ) - settings.NEARBY_SWEEP_SPLIT_RESERVE
+        for circle, places_data in batch:
+            results.append(places_data)
+            if not is_full_page(circle, places_data):
+                continue
+            children = [
+                child for child in split_circle(*circle)
+                if haversine_meters(lat, lng, child[0], child[1]) - child[2] < radius
+            ]
+            if (
+                circle[2] <= settings.NEARBY_SWEEP_MIN_SPLIT_RADIUS_METERS or
+                searches + len(pending) + len(children) > settings.NEARBY_SWEEP_MAX_SEARCHES or
+                len(pending) + len(children) > split_budget
+            ):
+                truncated.add(circle)
+                continue
+            pending.extend((child, circle) for child in children)
+
+    unique = list({
+        place["id"]: place for places_data in results for place in places_data
+    }.values())
+    distances = place_distances(unique, lat, lng)
+    order = np.argsort(distances, kind="stable")
+    return [unique[i] for i in order if distances[i] <= radius]
+
+
+def public_base_url(http_request: Request) -> str:
+    return (settings.PUBLIC_BASE_URL or str(http_request.base_url)).rstrip("/")
+
+
+def photo_url(base_url: str, photo_name: str) -> str:
+    """Link to our photo proxy, which keeps the API key off the client"""
+    return f"{base_url}/places/photos/{photo_name}?maxWidthPx={settings.PHOTO_MAX_WIDTH_PX}"
+
+
+def build_place_response(
+    place: dict, walk_in: bool, base_url: str, distance: float | None = None
+) -> PlaceResponse:
+    """Convert a filtered Google place payload into our response model"""
+    location = place.get("location", {})
+    photos = []
+    for photo in place.get("photos", []):
+        name = photo.get("name")  # e.g. "places/ChIJN1t_tDeuEmsRUsoyG83frY4/photos/0"
+        if name:
+            photos.append(photo_url(base_url, name))
+
+    # Payloads were already normalized by fetch_nearby_places, skip validation
+    return PlaceResponse.model_construct(
+        id=place["id"],
+        displayName=place.get("displayName", {}).get("text"),
+        formattedAddress=place.get("formattedAddress"),
+        location=PlaceLocationResponse.model_construct(
+            latitude=location.get("latitude"),
+            longitude=location.get("longitude")
+        ),
+        rating=place.get("rating"),
+        userRatingCount=place.get("userRatingCount"),
+        googleMapsUri=place.get("googleMapsUri"),
+        websiteUri=place.get("websiteUri"),
+        nationalPhoneNumber=place.get("nationalPhoneNumber"),
+        photos=photos,
+        walk_in=walk_in,
+        distanceMeters=None if distance is None else round(float(distance), 1)
+    )
+
+
+async def nearby_gyms_content(
+    request: NearbyGymsRequest,
+    http_request: Request,
+    db: AsyncSession,
+    google: GoogleClient
+) -> dict:
+    """Serialized NearbyGymsResponse shared by the POST and GET endpoints"""
+    
+    # Validate that search location is within Selangor/KL
+    if not is_within_selangor_kl(request.latitude, request.longitude):
+        raise HTTPException(
+            status_code=400,
+            detail="Search location must be within Selangor or Kuala Lumpur"
+        )
+
+    fetched = {}
+    stale = set()
+    truncated = set()
+    if request.sweep:
+        places_data = await sweep_nearby_place_payloads(
+            google, request.latitude, request.longitude, request.radius,
+            fetched, stale, truncated
+        )
+    else:
+        places_data = await get_nearby_place_payloads(
+            google, request.latitude, request.longitude, request.radius, fetched, stale
+        )
+        # The cached search covers the whole grid cell, not just this circle
+        places_data = clip_to_radius(
+            places_data, request.latitude, request.longitude, request.radius
+        )
+    await store_nearby_areas(db, fetched)
+
+    # One IN (...) lookup and at most one upsert for the whole result set
+    walk_in_statuses = await places_repository.get_walk_in_statuses(
+        db, [place["id"] for place in places_data]
     )
+    await db.commit()
 
-async def get_place_walk_in_status(db: AsyncSession, place_id: str) -> bool:
-    """Get walk-in status from database, default to True if not found"""
-    result = await db.execute(
-        select(Places).where(Places.places_id == place_id)
+    walk_in = [walk_in_statuses[place["id"]] for place in places_data]
+    distances = place_distances(places_data, request.latitude, request.longitude)
+    order = rank_places(
+        places_data,
+        walk_in,
+        distances,
+        request.radius,
+        walk_in_only=request.walk_in_only,
+        min_rating=request.min_rating,
+        min_review_count=request.min_review_count,
+        sort=request.sort,
+        limit=request.limit,
+        prior_rating=settings.RANKING_PRIOR_RATING,
+        prior_reviews=settings.RANKING_PRIOR_REVIEWS,
+        distance_weight=settings.RANKING_DISTANCE_WEIGHT
     )
-    place = result.scalar_one_or_none()
-    return place.walk_in if place else True
+
+    base_url = public_base_url(http_request)
+    places = [
+        build_place_response(places_data[i], walk_in[i], base_url, distances[i])
+        for i in order
+    ]
+    return NearbyGymsResponse.model_construct(
+        places=places, stale=bool(stale), truncated=bool(truncated)
+    ).model_dump()
+
+
+def stale_headers(content: dict) -> dict[str, str]:
+    return {"X-Served-Stale": "true"} if content["stale"] else {}
+
 
 @router.post("/nearby-gyms", response_model=NearbyGymsResponse)
 async def search_nearby_gyms(
     request: NearbyGymsRequest,
-    db: AsyncSession = Depends(get_db)
+    http_request: Request,
+    db: AsyncSession = Depends(get_db),
+    google: GoogleClient = Depends(get_google_client)
 ):
     """
     Returns nearby gyms in Selangor/KL using Google Places API v1
     Filters results to only include gyms within Selangor and Kuala Lumpur
     """
-    
-    # Validate that search location is within Selangor/KL
+    content = await nearby_gyms_content(request, http_request, db, google)
+    # Returning a response directly skips a second response_model validation
+    return ORJSONResponse(content, headers=stale_headers(content))
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(current_user: UserResponse = Depends(get_current_admin_user)):
+    """Hit/miss counters for the places caches (Admin only)"""
+    return {
+        "nearby_gyms": nearby_cache.stats(),
+        "autocomplete": autocomplete_cache.stats(),
+        "geocode": geocode_cache.stats(),
+        "tiles": tile_cache.stats(),
+        "upstream_singleflight": upstream_flight.stats(),
+        "quota": quota_governor.stats(),
+        "photo_quota": photo_quota_governor.stats(),
+        "background_refresh": refresher.stats(),
+        "photos": get_photo_cache().stats(),
+        "place_index": {"places": len(place_index)}
+    }
+
+
+@router.get("/nearby-gyms", response_model=NearbyGymsResponse)
+async def search_nearby_gyms_get(
+    http_request: Request,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: int = Query(default=1500, ge=100, le=MAX_SEARCH_RADIUS),
+    sweep: bool = False,
+    walk_in_only: bool = False,
+    min_rating: float | None = Query(default=None, ge=0, le=5),
+    min_review_count: int | None = Query(default=None, ge=0),
+    sort: SortOrder | None = None,
+    limit: int | None = Query(default=None, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    google: GoogleClient = Depends(get_google_client)
+):
+    """
+    GET version of nearby gyms search, cacheable by browsers and CDNs.
+    The ETag covers walk-in status, so it changes when an admin updates it.
+    """
+    request = NearbyGymsRequest(
+        latitude=lat,
+        longitude=lng,
+        radius=radius,
+        sweep=sweep,
+        walk_in_only=walk_in_only,
+        min_rating=min_rating,
+        min_review_count=min_review_count,
+        sort=sort,
+        limit=limit
+    )
+    content = await nearby_gyms_content(request, http_request, db, google)
+    # Stale results must not be stored by browsers or CDNs
+    cache_control = (
+        settings.STALE_CACHE_CONTROL if content["stale"] else settings.NEARBY_CACHE_CONTROL
+    )
+    return cacheable_json_response(
+        http_request, content, cache_control, headers=stale_headers(content)
+    )
+
+
+def encode_cursor(done: set[int]) -> str:
+    """Opaque continuation token listing the sub-searches already streamed"""
+    return base64.urlsafe_b64encode(json.dumps(sorted(done)).encode()).decode()
+
+
+def decode_cursor(cursor: str | None) -> set[int]:
+    if not cursor:
+        return set()
+    try:
+        return set(json.loads(base64.urlsafe_b64decode(cursor.encode())))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def format_stream_event(event: str, data: dict, stream_format: str) -> bytes:
+    if stream_format == "sse":
+        return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+    return orjson.dumps({"event": event, "data": data}) + b"\n"
+
+
+async def stream_nearby_gyms(
+    request: NearbyGymsRequest,
+    google: GoogleClient,
+    base_url: str,
+    stream_format: str,
+    done: set[int]
+) -> AsyncIterator[bytes]:
+    """
+    Emit each place as soon as its sub-search finishes and its walk-in
+    status is loaded, followed by a cursor covering that sub-search
+    """
+    if request.sweep:
+        circles = sweep_circles(request.latitude, request.longitude, request.radius)
+    else:
+        circles = [(request.latitude, request.longitude, request.radius)]
+
+    fetched = {}
+    stale = set()
+    semaphore = asyncio.Semaphore(settings.NEARBY_SWEEP_CONCURRENCY)
+
+    async def search(index: int) -> tuple[int, list[dict]]:
+        async with semaphore:
+            return index, await get_nearby_place_payloads(
+                google, *circles[index], fetched, stale
+            )
+
+    tasks = [
+        asyncio.ensure_future(search(index))
+        for index in range(len(circles)) if index not in done
+    ]
+    emitted = set()
+    try:
+        # The request's own session is closed before streaming starts
+        async with AsyncSessionLocal() as db:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    index, places_data = await next_done
+                except HTTPException as e:
+                    yield format_stream_event(
+                        "error", {"status": e.status_code, "detail": e.detail}, stream_format
+                    )
+                    return
+
+                distances = place_distances(places_data, request.latitude, request.longitude)
+                places_data = [
+                    (place, distance) for place, distance in zip(places_data, distances)
+                    if place["id"] not in emitted and distance <= request.radius
+                ]
+                walk_in_statuses = await places_repository.get_walk_in_statuses(
+                    db, [place["id"] for place, _ in places_data]
+                )
+                await db.commit()
+
+                for place, distance in places_data:
+                    emitted.add(place["id"])
+                    response = build_place_response(
+                        place, walk_in_statuses[place["id"]], base_url, distance
+                    )
+                    yield format_stream_event("place", response.model_dump(), stream_format)
+
+                done.add(index)
+                yield format_stream_event("cursor", {"cursor": encode_cursor(done)}, stream_format)
+
+            await store_nearby_areas(db, fetched)
+            await db.commit()
+        yield format_stream_event(
+            "done", {"count": len(emitted), "stale": bool(stale)}, stream_format
+        )
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@router.get("/nearby-gyms/stream")
+async def search_nearby_gyms_stream(
+    http_request: Request,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: int = Query(default=1500, ge=100, le=MAX_SEARCH_RADIUS),
+    sweep: bool = False,
+    format: Literal["ndjson", "sse"] = "ndjson",
+    cursor: str | None = None,
+    google: GoogleClient = Depends(get_google_client)
+):
+    """
+    Streaming nearby gyms search as newline-delimited JSON or server-sent
+    events. Pass the last cursor back to resume an interrupted stream.
+    """
+    request = NearbyGymsRequest(latitude=lat, longitude=lng, radius=radius, sweep=sweep)
     if not is_within_selangor_kl(request.latitude, request.longitude):
         raise HTTPException(
             status_code=400,
             detail="Search location must be within Selangor or Kuala Lumpur"
         )
 
-    url = "https://places.googleapis.com/v1/places:searchNearby"
-
-    payload = {
-        "includedTypes": ["gym", "fitness_center"],
-        "maxResultCount": 20,
-        "locationRestriction": {
-            "circle": {
-                "center": {
-                    "latitude": request.latitude,
-                    "longitude": request.longitude
-                },
-                "radius": request.radius
-            }
-        }
-    }
+    done = decode_cursor(cursor)
+    return StreamingResponse(
+        stream_nearby_gyms(request, google, public_base_url(http_request), format, done),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-    headers = {
-        "Content-Type": "application/json",
-        "X-Goog-Api-Key": settings.GOOGLE_PLACES_API_KEY,
-        "X-Goog-FieldMask": (
-            "places.id,"
-            "places.displayName,"
-            "places.formattedAddress,"
-            "places.location,"
-            "places.rating,"
-            "places.userRatingCount,"
-            "places.googleMapsUri,"
-            "places.websiteUri,"
-            "places.photos,"
-            "places.nationalPhoneNumber,"
-        ),
-    }
 
-    try:
-        async with httpx.AsyncClient(timeout=10, verify=certifi.where()) as client:
-            response = await client.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=500, detail=f"Request error: {e}")
-    except httpx.HTTPStatusError as e:
+def tiles_version() -> tuple[str, float]:
+    """Current tile version and the seconds until it changes"""
+    period = settings.TILE_VERSION_SECONDS
+    now = time.time()
+    bucket = int(now // period)
+    return str(bucket), (bucket + 1) * period - now
+
+
+async def fill_tile(
+    google: GoogleClient, tile: tuple[int, int, int]
+) -> tuple[list[dict], bool, bool]:
+    """
+    Sweep the circle covering a TILE_FILL_ZOOM tile and keep the places
+    inside it. Runs inside the single-flight, so it uses its own session.
+    Returns the payloads, whether any of them were served stale and
+    whether the sweep was truncated.
+    """
+    # A cold map view fans out into dozens of searches, so they are charged
+    # to the shared tiles bucket rather than the caller's. The single-flight
+    # runs this in its own task, so the caller's context is left alone.
+    quota_client.set(TILES_QUOTA_CLIENT)
+    bounds = tile_bounds(*tile)
+    fetched = {}
+    stale = set()
+    truncated = set()
+    places_data = await sweep_nearby_place_payloads(
+        google, *bounds_circle(bounds), fetched, stale, truncated
+    )
+    places_data = [
+        place for place in places_data
+        if bounds_contain(bounds, place["location"]["latitude"], place["location"]["longitude"])
+    ]
+
+    if fetched:
+        async with AsyncSessionLocal() as db:
+            await store_nearby_areas(db, fetched)
+            await db.commit()
+
+    # Stale or truncated fills are not cached, so the next request tries
+    # Google again once the budget has refilled
+    if not stale and not truncated:
+        tile_cache.set(tile, places_data)
+    return places_data, bool(stale), bool(truncated)
+
+
+async def get_tile_place_payloads(
+    google: GoogleClient, z: int, x: int, y: int
+) -> tuple[list[dict], bool, bool]:
+    """
+    Places inside a tile, clipped from the TILE_FILL_ZOOM tile containing
+    it, or merged from the fill tiles it contains when zoomed further out.
+    Also returns whether any fill was stale and whether any was truncated.
+    """
+    bounds = tile_bounds(z, x, y)
+    if not bounds_intersect(bounds, SELANGOR_KL_BOUNDS):
+        return [], False, False
+
+    fill_zoom = settings.TILE_FILL_ZOOM
+    if z >= fill_zoom:
+        fill_tiles = [ancestor_tile(z, x, y, fill_zoom)]
+    else:
+        fill_tiles = [
+            tile for tile in descendant_tiles(z, x, y, fill_zoom)
+            if bounds_intersect(tile_bounds(*tile), SELANGOR_KL_BOUNDS)
+        ]
+
+    async def fill(tile: tuple[int, int, int]) -> tuple[list[dict], bool, bool]:
+        places_data = tile_cache.get(tile)
+        if places_data is not None:
+            return places_data, False, False
+        result, _ = await upstream_flight.do(("tile", tile), lambda: fill_tile(google, tile))
+        return result
+
+    results = await asyncio.gather(*(fill(tile) for tile in fill_tiles))
+    places_data = [
+        place for tile_places, _, _ in results for place in tile_places
+        if bounds_contain(bounds, place["location"]["latitude"], place["location"]["longitude"])
+    ]
+    return (
+        places_data,
+        any(stale for _, stale, _ in results),
+        any(truncated for _, _, truncated in results)
+    )
+
+
+@router.get("/tiles/version")
+async def get_tiles_version(http_request: Request):
+    """Version to pass as `v` to /places/tiles, cacheable until it changes"""
+    version, expires_in = tiles_version()
+    return cacheable_json_response(
+        http_request,
+        {"version": version, "expiresIn": int(expires_in)},
+        f"public, max-age={int(expires_in)}"
+    )
+
+
+@router.get("/tiles/{z}/{x}/{y}", response_model=NearbyGymsResponse)
+async def get_gym_tile(
+    z: int,
+    x: int,
+    y: int,
+    http_request: Request,
+    v: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    google: GoogleClient = Depends(get_google_client)
+):
+    """
+    Gyms inside a Web-Mercator slippy-map tile within Selangor/KL. Requested
+    with the current `v` from /places/tiles/version the response is cached
+    as immutable, since the next version changes the URL, unless the fill
+    was stale or truncated. Walk-in changes show up in tiles from the next
+    version on.
+    """
+    if not settings.TILE_MIN_ZOOM <= z <= settings.TILE_MAX_ZOOM:
         raise HTTPException(
-            status_code=e.response.status_code,
-            detail=f"Google API error: {e.response.text}"
+            status_code=400,
+            detail=f"Zoom must be between {settings.TILE_MIN_ZOOM} and {settings.TILE_MAX_ZOOM}"
         )
+    if not is_valid_tile(z, x, y):
+        raise HTTPException(status_code=404, detail="Tile not found")
 
-    data = response.json()
-    places = []
-    excluded_keywords = ["hotel", "resort", "park", "field", "playground", "garden"]
+    places_data, stale, truncated = await get_tile_place_payloads(google, z, x, y)
+    walk_in_statuses = await places_repository.get_walk_in_statuses(
+        db, [place["id"] for place in places_data]
+    )
+    await db.commit()
 
-    # Filter and process results
-    for place in data.get("places", []):
-        location = place.get("location", {})
-        lat = location.get("latitude")
-        lng = location.get("longitude")
-        name = place.get("displayName", {}).get("text", "").lower()
+    base_url = public_base_url(http_request)
+    places = [
+        build_place_response(place, walk_in_statuses[place["id"]], base_url)
+        for place in places_data
+    ]
+    content = NearbyGymsResponse.model_construct(
+        places=places, stale=stale, truncated=truncated
+    ).model_dump()
 
-        if any(word in name for word in excluded_keywords):
-            continue
-        
-        # Filter: Only include gyms within Selangor/KL
-        if lat and lng and is_within_selangor_kl(lat, lng):
-            place_id = place.get("id")
-
-            result = await db.execute(select(Places).where(Places.places_id == place_id))
-            existing_place = result.scalar_one_or_none()
-
-            if not existing_place:
-     
-                new_place = Places(
-                    places_id=place_id,
-                    walk_in=True  # default value
-                )
-                db.add(new_place)
-            
-            # Get walk-in status from database
-            walk_in = await get_place_walk_in_status(db, place_id)
-            photos = []
-            for photo in place.get("photos", []):
-                name = photo.get("name")  # e.g. "places/ChIJN1t_tDeuEmsRUsoyG83frY4/photos/0"
-                if name:
-                    photo_url = f"https://places.googleapis.com/v1/{name}/media?maxWidthPx=400&key={settings.GOOGLE_PLACES_API_KEY}"
-                    photos.append(photo_url)
-            
-            places.append(PlaceResponse(
-                id=place_id,
-                displayName=place.get("displayName", {}).get("text"),
-                formattedAddress=place.get("formattedAddress"),
-                location=PlaceLocationResponse(latitude=lat, longitude=lng),
-                rating=place.get("rating"),
-                userRatingCount=place.get("userRatingCount"),
-                googleMapsUri=place.get("googleMapsUri"),
-                websiteUri=place.get("websiteUri"),
-                nationalPhoneNumber=place.get("nationalPhoneNumber"),
-                photos=photos,
-                walk_in=walk_in
-            ))
-    await db.commit()
-    return NearbyGymsResponse(places=places)
+    version, _ = tiles_version()
+    if stale:
+        cache_control = settings.STALE_CACHE_CONTROL
+    elif truncated:
+        # Refilled once the tiles budget allows, so only cached briefly
+        cache_control = settings.NEARBY_CACHE_CONTROL
+    elif v == version:
+        cache_control = settings.TILE_CACHE_CONTROL
+    else:
+        cache_control = settings.NEARBY_CACHE_CONTROL
+    return cacheable_json_response(
+        http_request,
+        content,
+        cache_control,
+        headers={"X-Tiles-Version": version, **stale_headers(content)}
+    )
 
 
-@router.get("/nearby-gyms", response_model=NearbyGymsResponse)
-async def search_nearby_gyms_get(
-    lat: float,
-    lng: float,
-    radius: int = 1500,
-    db: AsyncSession = Depends(get_db)
+def photo_width(requested: int) -> int:
+    """The smallest of PHOTO_WIDTHS_PX at least as wide as requested, else the widest"""
+    widths = sorted(settings.PHOTO_WIDTHS_PX)
+    return next((width for width in widths if width >= requested), widths[-1])
+
+
+def get_photo_cache() -> PhotoDiskCache:
+    global photo_cache
+    if photo_cache is None:
+        photo_cache = PhotoDiskCache(
+            settings.PHOTO_CACHE_DIR, settings.PHOTO_CACHE_MAX_BYTES
+        )
+    return photo_cache
+
+
+async def fetch_photo(
+    google: GoogleClient, photo_name: str, max_width: int, key: str
+) -> PhotoEntry:
+    """Stream a photo from Google into the disk cache"""
+    cache = get_photo_cache()
+    temp_file = cache.open_temp()
+    try:
+        with temp_file:
+            digest, content_type = await google.download_photo(
+                photo_name, max_width, temp_file
+            )
+    except BaseException:
+        os.unlink(temp_file.name)
+        raise
+    return await run_in_threadpool(cache.store, key, temp_file.name, digest, content_type)
+
+
+@router.get("/photos/{photo_name:path}")
+async def get_place_photo(
+    photo_name: str,
+    http_request: Request,
+    max_width: int = Query(default=400, ge=1, le=4800, alias="maxWidthPx"),
+    google: GoogleClient = Depends(get_google_client)
 ):
-    """GET version of nearby gyms search"""
-    request = NearbyGymsRequest(latitude=lat, longitude=lng, radius=radius)
-    return await search_nearby_gyms(request, db)
+    """
+    Serve a place photo through a content-addressed disk cache so the
+    API key never reaches the client and repeat loads are not billed.
+    maxWidthPx is rounded up to one of PHOTO_WIDTHS_PX.
+    """
+    if not PHOTO_NAME_PATTERN.match(photo_name):
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    max_width = photo_width(max_width)
+    key = f"{photo_name}?maxWidthPx={max_width}"
+    entry = get_photo_cache().lookup(key)
+    for _ in range(2):
+        if entry is None:
+            try:
+                entry, _ = await upstream_flight.do(
+                    ("photo", key), lambda: fetch_photo(google, photo_name, max_width, key)
+                )
+            except GOOGLE_ERRORS as e:
+                raise google_http_exception(e)
+
+        headers = {"ETag": f'"{entry.digest}"', "Cache-Control": PHOTO_CACHE_CONTROL}
+        if etag_matches(http_request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        try:
+            stat_result = os.stat(entry.path)
+        except FileNotFoundError:
+            # Evicted by a concurrent store since the lookup, fetch it again
+            entry = None
+            continue
+        return FileResponse(
+            entry.path, media_type=entry.content_type, headers=headers, stat_result=stat_result
+        )
+
+    raise HTTPException(status_code=503, detail="Photo cache is full, please retry")
 
 
 @router.patch("/gyms/{place_id}/walk-in", response_model=PlaceInDB)
@@ -177,25 +1008,15 @@ async def update_gym_walk_in(
     place_id: str,
     request: UpdateWalkInRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: UserResponse = Depends(get_current_admin_user)
 ):
     """
     Update walk-in availability for a specific gym (Admin only)
     """
-    result = await db.execute(
-        select(Places).where(Places.places_id == place_id)
-    )
-    place = result.scalar_one_or_none()
-    
-    if place:
-        place.walk_in = request.walk_in
-    else:
-        place = Places(places_id=place_id, walk_in=request.walk_in)
-        db.add(place)
-    
+    place = await places_repository.upsert_walk_in(db, place_id, request.walk_in)
     await db.commit()
-    await db.refresh(place)
-    
+    await publish_walk_in([(place.places_id, place.walk_in)])
+
     return PlaceInDB(
         id=place.id,
         places_id=place.places_id,
@@ -203,34 +1024,300 @@ async def update_gym_walk_in(
     )
 
 
+async def publish_walk_in(changes: Iterable[tuple[str, bool]]) -> None:
+    """
+    Push committed walk-in changes to live subscribers. The write already
+    succeeded, so a broker failure is logged rather than raised.
+    """
+    messages = [
+        (places_id, {"id": places_id, "walk_in": walk_in}) for places_id, walk_in in changes
+    ]
+    try:
+        await get_broker().publish(messages)
+    except Exception:
+        logger.exception("Publishing %d walk-in changes failed", len(messages))
+
+
+async def walk_in_snapshot_event(place_ids: list[str]) -> bytes:
+    """Current walk-in status of every subscribed place, read without creating rows"""
+    async with AsyncSessionLocal() as db:
+        places = await places_repository.get_places_by_ids(db, place_ids)
+    statuses = {
+        places_id: places[places_id].walk_in if places_id in places else True
+        for places_id in place_ids
+    }
+    return format_stream_event("snapshot", {"walk_in": statuses}, "sse")
+
+
+async def stream_walk_in_updates(place_ids: list[str]) -> AsyncIterator[bytes]:
+    broker = get_broker()
+    # Subscribe before the snapshot so no commit falls between the two
+    subscription = broker.subscribe(place_ids, settings.WALK_IN_STREAM_QUEUE_SIZE)
+    try:
+        yield await walk_in_snapshot_event(place_ids)
+        while True:
+            message = await subscription.get(settings.WALK_IN_STREAM_KEEPALIVE_SECONDS)
+            if message is None:
+                yield b": keepalive\n\n"
+            elif message is RESYNC:
+                # Updates were dropped for this slow client, send current state instead
+                yield await walk_in_snapshot_event(place_ids)
+            else:
+                yield format_stream_event("walk_in", message, "sse")
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.get("/gyms/walk-in/stream")
+async def stream_gym_walk_in(
+    ids: str = Query(..., description="Comma-separated Google Place IDs currently on screen")
+):
+    """
+    Server-sent events with walk-in changes for the given gyms as they are
+    committed: a snapshot event first, then one walk_in event per change.
+    Reconnect with the new ids when the visible set changes.
+    """
+    place_ids = list(dict.fromkeys(
+        place_id.strip() for place_id in ids.split(",") if place_id.strip()
+    ))
+    if not place_ids or len(place_ids) > settings.WALK_IN_STREAM_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Between 1 and {settings.WALK_IN_STREAM_MAX_IDS} place ids are required"
+        )
+    if any(len(place_id) > 50 for place_id in place_ids):
+        raise HTTPException(status_code=400, detail="Invalid place id")
+
+    return StreamingResponse(
+        stream_walk_in_updates(place_ids),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+WALK_IN_VALUES = {
+    "true": True, "1": True, "yes": True, "y": True,
+    "false": False, "0": False, "no": False, "n": False,
+}
+
+
+def parse_walk_in_row(row: list[str], line_number: int) -> dict:
+    if len(row) != 2 or row[1].strip().lower() not in WALK_IN_VALUES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Line {line_number}: expected places_id,walk_in"
+        )
+    places_id = row[0].strip()
+    if not places_id or len(places_id) > 50:
+        raise HTTPException(status_code=400, detail=f"Line {line_number}: invalid places_id")
+    return {"places_id": places_id, "walk_in": WALK_IN_VALUES[row[1].strip().lower()]}
+
+
+async def read_csv_rows(http_request: Request) -> AsyncIterator[tuple[int, list[str]]]:
+    """Parse an uploaded CSV body line by line as it arrives"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    line_number = 0
+    async for chunk in http_request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, next(csv.reader([line]))
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield line_number + 1, next(csv.reader([buffer]))
+
+
+@router.patch("/gyms/walk-in", response_model=BulkWalkInResponse)
+async def bulk_update_gym_walk_in(
+    request: BulkWalkInRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """
+    Update walk-in availability for many gyms in one transaction (Admin only)
+    """
+    rows = {update.places_id: update.walk_in for update in request.updates}
+    rows = [{"places_id": places_id, "walk_in": walk_in} for places_id, walk_in in rows.items()]
+
+    chunk_size = settings.WALK_IN_BULK_CHUNK_SIZE
+    for start in range(0, len(rows), chunk_size):
+        await places_repository.bulk_upsert_walk_in(db, rows[start:start + chunk_size])
+    await db.commit()
+    await publish_walk_in((row["places_id"], row["walk_in"]) for row in rows)
+
+    return BulkWalkInResponse(updated=len(rows))
+
+
+@router.post("/gyms/walk-in/import", response_model=BulkWalkInResponse)
+async def import_gym_walk_in(
+    http_request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """
+    Apply a streamed CSV of places_id,walk_in rows in chunked upserts inside
+    one transaction (Admin only). A header row is optional.
+    """
+    chunk = []
+    changes = {}
+    updated = 0
+    async for line_number, row in read_csv_rows(http_request):
+        if line_number == 1 and [cell.strip().lower() for cell in row] == ["places_id", "walk_in"]:
+            continue
+        chunk.append(parse_walk_in_row(row, line_number))
+        if len(chunk) >= settings.WALK_IN_BULK_CHUNK_SIZE:
+            await places_repository.bulk_upsert_walk_in(db, chunk)
+            changes.update((row["places_id"], row["walk_in"]) for row in chunk)
+            updated += len(chunk)
+            chunk = []
+
+    await places_repository.bulk_upsert_walk_in(db, chunk)
+    changes.update((row["places_id"], row["walk_in"]) for row in chunk)
+    updated += len(chunk)
+    await db.commit()
+    await publish_walk_in(changes.items())
+
+    return BulkWalkInResponse(updated=updated)
+
+
+async def export_walk_in_csv() -> AsyncIterator[str]:
+    # The request's own session is closed before streaming starts
+    async with AsyncSessionLocal() as db:
+        yield "places_id,walk_in\n"
+        lines = []
+        async for places_id, walk_in in places_repository.stream_walk_in(
+            db, settings.WALK_IN_BULK_CHUNK_SIZE
+        ):
+            lines.append(f"{places_id},{str(walk_in).lower()}\n")
+            if len(lines) >= settings.WALK_IN_BULK_CHUNK_SIZE:
+                yield "".join(lines)
+                lines = []
+        yield "".join(lines)
+
+
+@router.get("/gyms/walk-in/export")
+async def export_gym_walk_in(
+    current_user: UserResponse = Depends(get_current_admin_user)
+):
+    """Stream every gym's walk-in status as CSV (Admin only)"""
+    return StreamingResponse(
+        export_walk_in_csv(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="walk_in.csv"'}
+    )
+
+
+def geocode_address_key(address: str) -> str:
+    """Normalized address, hashed when too long for the indexed column"""
+    key = normalize_query(address)
+    if len(key) > 255:
+        key = hashlib.sha256(key.encode()).hexdigest()
+    return key
+
+
+async def resolve_geocode(
+    db: AsyncSession, google: GoogleClient, address: str
+) -> tuple[str, float | None, float | None]:
+    """
+    (status, lat, lng) for an address from the L1 cache, then
+    t_geocode_cache, then Google. OK and ZERO_RESULTS are cached.
+    Raises the Google client's errors untranslated.
+    """
+    key = geocode_address_key(address)
+    cached = geocode_cache.get(key)
+    if cached is not None:
+        return cached
+
+    entry = await geocode_repository.get_geocode(db, key)
+    if entry:
+        cached = (entry.status, entry.latitude, entry.longitude)
+        ttl = None
+        if entry.expires_at:
+            ttl = min((entry.expires_at - datetime.now()).total_seconds(), geocode_cache.ttl)
+        geocode_cache.set(key, cached, ttl=ttl)
+        return cached
+
+    data, shared = await upstream_flight.do(
+        ("geocode", key), lambda: google.geocode(normalize_query(address))
+    )
+
+    status = data["status"]
+    if status == "OK":
+        location = data["results"][0]["geometry"]["location"]
+        cached = (status, location["lat"], location["lng"])
+        if not shared:
+            await geocode_repository.upsert_geocode(db, key, *cached)
+        geocode_cache.set(key, cached)
+    elif status == "ZERO_RESULTS":
+        # Negative entries expire so new addresses eventually resolve
+        negative_ttl = settings.GEOCODE_NEGATIVE_TTL_SECONDS
+        cached = (status, None, None)
+        if not shared:
+            await geocode_repository.upsert_geocode(
+                db, key, *cached, expires_at=datetime.now() + timedelta(seconds=negative_ttl)
+            )
+        geocode_cache.set(key, cached, ttl=min(negative_ttl, geocode_cache.ttl))
+    else:
+        return status, None, None
+
+    await db.commit()
+    return cached
+
+
 @router.get("/geocode")
-async def geocode_location(address: str):
+async def geocode_location(
+    address: str,
+    http_request: Request,
+    db: AsyncSession = Depends(get_db),
+    google: GoogleClient = Depends(get_google_client)
+):
     """Convert address into lat/lng using Google Geocoding API"""
-    encoded_address = urllib.parse.quote(address)
-    url = f"https://maps.googleapis.com/maps/api/geocode/json?address={encoded_address}&key={settings.GOOGLE_PLACES_API_KEY}"
-
+    geocode_hot_keys.record(normalize_query(address))
     try:
-        async with httpx.AsyncClient(verify=certifi.where()) as client:
-            response = await client.get(url)
-            data = response.json()
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Request error: {e}")
+        status, lat, lng = await resolve_geocode(db, google, address)
+    except GOOGLE_ERRORS as e:
+        raise google_http_exception(e)
 
-    if data["status"] != "OK":
-        raise HTTPException(status_code=400, detail=f"Failed to geocode address: {data.get('status')}")
+    if status != "OK":
+        raise HTTPException(status_code=400, detail=f"Failed to geocode address: {status}")
 
-    location = data["results"][0]["geometry"]["location"]
-    return {"lat": location["lat"], "lng": location["lng"]}
+    return cacheable_json_response(
+        http_request, {"lat": lat, "lng": lng}, settings.GEOCODE_CACHE_CONTROL
+    )
 
 @router.get("/autocomplete")
-async def autocomplete_locations(input: str):
+async def autocomplete_locations(
+    input: str,
+    http_request: Request,
+    google: GoogleClient = Depends(get_google_client)
+):
     """Get location suggestions using Google Places Autocomplete"""
-    encoded_input = urllib.parse.quote(input)
-    url = f"https://maps.googleapis.com/maps/api/place/autocomplete/json?input={encoded_input}&key={settings.GOOGLE_PLACES_API_KEY}"
+    query = normalize_query(input)
+    predictions = autocomplete_cache.get(query)
+    if predictions is not None:
+        return cacheable_json_response(
+            http_request,
+            {"predictions": predictions, "stale": False},
+            settings.AUTOCOMPLETE_CACHE_CONTROL
+        )
 
-    async with httpx.AsyncClient(verify=certifi.where()) as client:
-        response = await client.get(url)
-        data = response.json()
+    try:
+        data, _ = await upstream_flight.do(
+            ("autocomplete", query), lambda: google.autocomplete(query)
+        )
+    except GOOGLE_ERRORS as e:
+        predictions = autocomplete_fallback.get(query)
+        if not is_over_budget(e) or predictions is None:
+            raise google_http_exception(e)
+        return cacheable_json_response(
+            http_request,
+            {"predictions": predictions, "stale": True},
+            settings.STALE_CACHE_CONTROL,
+            headers={"X-Served-Stale": "true"}
+        )
 
     if data["status"] not in ["OK", "ZERO_RESULTS"]:
         raise HTTPException(
@@ -238,4 +1325,60 @@ async def autocomplete_locations(input: str):
             detail=f"Failed to fetch suggestions: {data.get('status')}"
         )
 
-    return {"predictions": data.get("predictions", [])}
\ No newline at end of file
+    predictions = data.get("predictions", [])
+    autocomplete_cache.set(query, predictions)
+    autocomplete_fallback.set(query, predictions)
+    return cacheable_json_response(
+        http_request,
+        {"predictions": predictions, "stale": False},
+        settings.AUTOCOMPLETE_CACHE_CONTROL
+    )
+
+def nearby_needs_refresh(cache_key: tuple[int, int, int]) -> bool:
+    """Due once the area would stop being fresh within the refresh lead time"""
+    max_age = settings.PLACES_AREA_FRESH_SECONDS - settings.REFRESH_LEAD_SECONDS
+    return not place_index.is_fresh(*nearby_cache_search_area(cache_key), max_age=max_age)
+
+
+async def refresh_nearby_area(cache_key: tuple[int, int, int]) -> None:
+    places_data, shared = await upstream_flight.do(
+        ("nearby", cache_key),
+        lambda: fetch_nearby_area(get_google_client(), cache_key)
+    )
+    if not shared:
+        async with AsyncSessionLocal() as db:
+            await store_nearby_areas(db, {cache_key: places_data})
+            await db.commit()
+
+
+def geocode_needs_refresh(address: str) -> bool:
+    """
+    Due when the L1 entry is about to expire. Statuses that are never
+    cached have no entry and are skipped, so a popular bad address does
+    not cost a Google call every cycle.
+    """
+    remaining = geocode_cache.expires_in(geocode_address_key(address))
+    return remaining is not None and remaining < settings.REFRESH_LEAD_SECONDS
+
+
+async def refresh_geocode(address: str) -> None:
+    # Dropping the L1 entry makes resolve_geocode reload it from MySQL or Google
+    geocode_cache.pop(geocode_address_key(address))
+    async with AsyncSessionLocal() as db:
+        await resolve_geocode(db, get_google_client(), address)
+
+
+# Keeps the hottest areas and addresses warm, started from the app lifespan
+refresher = BackgroundRefresher(
+    sources=[
+        RefreshSource("nearby", nearby_hot_keys, nearby_needs_refresh, refresh_nearby_area),
+        RefreshSource("geocode", geocode_hot_keys, geocode_needs_refresh, refresh_geocode),
+    ],
+    interval=settings.REFRESH_INTERVAL_SECONDS,
+    jitter=settings.REFRESH_JITTER,
+    top_n=settings.REFRESH_TOP_N,
+    min_score=settings.REFRESH_MIN_SCORE,
+    budget=settings.REFRESH_UPSTREAM_BUDGET,
+    concurrency=settings.REFRESH_CONCURRENCY
+)
+stats_gauge(registry, "background_refresh", "Background refresher counters", refresher.stats)
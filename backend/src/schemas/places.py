@@ -1,15 +1,35 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Literal
 
 # Request Schemas
 class NearbyGymsRequest(BaseModel):
     latitude: float = Field(..., ge=-90, le=90, description="Latitude coordinate")
     longitude: float = Field(..., ge=-180, le=180, description="Longitude coordinate")
     radius: int = Field(default=1500, ge=100, le=50000, description="Search radius in meters")
+    sweep: bool = Field(
+        default=False,
+        description="Split large searches into concurrent sub-searches to get past the 20-result limit"
+    )
+    walk_in_only: bool = Field(default=False, description="Only gyms that allow walk-ins")
+    min_rating: Optional[float] = Field(default=None, ge=0, le=5, description="Minimum Google rating")
+    min_review_count: Optional[int] = Field(default=None, ge=0, description="Minimum number of Google ratings")
+    sort: Optional[Literal["distance", "rating", "score"]] = Field(
+        default=None,
+        description="distance, rating, or score (rating weighted by review count and blended with distance). "
+                    "Defaults to Google's order, or nearest first for sweeps"
+    )
+    limit: Optional[int] = Field(default=None, ge=1, le=500, description="Maximum number of gyms returned")
 
 class UpdateWalkInRequest(BaseModel):
     walk_in: bool = Field(..., description="Whether the gym allows walk-ins")
 
+class WalkInUpdate(BaseModel):
+    places_id: str = Field(..., max_length=50, description="Google Place ID")
+    walk_in: bool
+
+class BulkWalkInRequest(BaseModel):
+    updates: list[WalkInUpdate] = Field(..., min_length=1, max_length=50000)
+
 # Response Schemas
 class PlaceLocationResponse(BaseModel):
     latitude: float
@@ -27,9 +47,21 @@ class PlaceResponse(BaseModel):
     nationalPhoneNumber: Optional[str] = None
     photos: Optional[List[str]] = None
     walk_in: bool = Field(default=True, description="Walk-in availability (from database)")
+    distanceMeters: Optional[float] = Field(default=None, description="Distance from the search center")
 
 class NearbyGymsResponse(BaseModel):
     places: list[PlaceResponse]
+    stale: bool = Field(
+        default=False,
+        description="Served from stored results because the Google API budget was exhausted"
+    )
+    truncated: bool = Field(
+        default=False,
+        description="Part of a sweep still hit Google's 20-result limit, so some gyms may be missing"
+    )
+
+class BulkWalkInResponse(BaseModel):
+    updated: int = Field(..., description="Number of rows applied")
 
 # Database Schemas
 class PlaceCreate(BaseModel):
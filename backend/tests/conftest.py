@@ -0,0 +1,6 @@
+import os
+
+# The query-count tests write to MySQL, so they only run against a
+# throwaway database given here, never the DATABASE_URL from .env
+if os.environ.get("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
@@ -0,0 +1,78 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from src.bench.fake_google import FakeGoogleConfig, create_fake_google_app
+from src.core.google_client import GoogleClient, get_google_client
+from src.db.database import dispose_engine, get_engine
+from src.db.instrumentation import assert_max_queries
+from src.db.models import Base
+from src.main import app
+from src.routers import places
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("TEST_DATABASE_URL"),
+    reason="needs a throwaway MySQL database in TEST_DATABASE_URL",
+)
+
+
+def run_with_app(scenario):
+    """Run `scenario(client)` against the app with Google swapped for the bench fake"""
+    async def run():
+        fake = create_fake_google_app(FakeGoogleConfig(latency_ms=0, jitter_ms=0))
+        google = GoogleClient(
+            api_key="test",
+            places_base_url="http://fake-google",
+            maps_base_url="http://fake-google",
+            transport=httpx.ASGITransport(app=fake),
+        )
+        app.dependency_overrides[get_google_client] = lambda: google
+        places.nearby_cache.clear()
+        places.full_nearby_areas.clear()
+        try:
+            async with get_engine().begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await conn.run_sync(Base.metadata.create_all)
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                await scenario(client)
+        finally:
+            app.dependency_overrides.pop(get_google_client, None)
+            await google.aclose()
+            await dispose_engine()
+
+    asyncio.run(run())
+
+
+def test_nearby_gyms_query_count():
+    search = {"latitude": 3.1579, "longitude": 101.7116, "radius": 1500}
+
+    async def scenario(client: httpx.AsyncClient):
+        # Upsert places, record the area, look up walk-in, register new places
+        with assert_max_queries(4):
+            response = await client.post("/places/nearby-gyms", json=search)
+        assert response.status_code == 200
+        assert response.json()["places"]
+
+        # Served from the response cache, only the walk-in lookup remains
+        with assert_max_queries(1):
+            response = await client.post("/places/nearby-gyms", json=search)
+        assert response.status_code == 200
+
+    run_with_app(scenario)
+
+
+def test_nearby_gyms_sweep_query_count():
+    search = {"latitude": 3.1579, "longitude": 101.7116, "radius": 5000, "sweep": True}
+
+    async def scenario(client: httpx.AsyncClient):
+        # Every sub-search is written and looked up in the same four statements
+        with assert_max_queries(4) as trace:
+            response = await client.post("/places/nearby-gyms", json=search)
+        assert response.status_code == 200
+        assert not trace.repeated()
+
+    run_with_app(scenario)
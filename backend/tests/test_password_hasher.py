@@ -0,0 +1,17 @@
+import asyncio
+
+from src.core.security import PasswordHasher
+
+
+def test_hasher_runs_again_after_shutdown():
+    hasher = PasswordHasher(max_workers=2, queue_timeout=1)
+
+    async def add(a: int, b: int) -> int:
+        return await hasher.run(lambda: a + b)
+
+    # One event loop per app lifespan, with a shutdown in between
+    assert asyncio.run(add(1, 2)) == 3
+    hasher.shutdown()
+    assert asyncio.run(add(3, 4)) == 7
+    hasher.shutdown()
+    assert hasher.stats()["completed"] == 2
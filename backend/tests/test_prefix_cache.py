@@ -0,0 +1,60 @@
+from src.core.prefix_cache import PrefixCache, normalize_query, prediction_matches
+
+
+def predictions(*descriptions: str) -> list[dict]:
+    return [{"description": description} for description in descriptions]
+
+
+def test_normalize_query_collapses_case_and_whitespace():
+    assert normalize_query("  Petaling   JAYA ") == "petaling jaya"
+
+
+def test_prediction_matches_word_prefixes():
+    prediction = {"description": "Petaling Jaya, Selangor, Malaysia"}
+    assert prediction_matches(prediction, "pet jay")
+    assert not prediction_matches(prediction, "pet kl")
+
+
+def test_exact_hit():
+    cache = PrefixCache(maxsize=10, ttl=60, complete_below=5)
+    cache.set("Puchong", predictions("Puchong, Selangor"))
+    assert cache.get("puchong ") == predictions("Puchong, Selangor")
+    assert cache.stats()["hits"] == 1
+
+
+def test_complete_prefix_answers_longer_query():
+    cache = PrefixCache(maxsize=10, ttl=60, complete_below=5)
+    cache.set("pe", predictions("Petaling Jaya", "Petaling Street", "Pekan Meru"))
+    assert cache.get("peta") == predictions("Petaling Jaya", "Petaling Street")
+    assert cache.stats()["prefix_hits"] == 1
+
+
+def test_full_prefix_list_is_not_filtered():
+    cache = PrefixCache(maxsize=10, ttl=60, complete_below=3)
+    cache.set("pe", predictions("Petaling Jaya", "Petaling Street", "Pekan Meru"))
+    # Upstream returned a full list, so it may be missing matches for "peta"
+    assert cache.get("peta") is None
+
+
+def test_prefix_filter_can_be_disabled():
+    cache = PrefixCache(maxsize=10, ttl=60, complete_below=5, prefix_filter=False)
+    cache.set("pe", predictions("Petaling Jaya"))
+    assert cache.get("peta") is None
+
+
+def test_expired_entries_miss():
+    cache = PrefixCache(maxsize=10, ttl=0, complete_below=5)
+    cache.set("klang", predictions("Klang"))
+    assert cache.get("klang") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_is_evicted():
+    cache = PrefixCache(maxsize=2, ttl=60, complete_below=5)
+    cache.set("a", predictions("A"))
+    cache.set("b", predictions("B"))
+    cache.get("a")
+    cache.set("c", predictions("C"))
+    assert cache.get("b") is None
+    assert cache.get("a") == predictions("A")
+    assert cache.get("c") == predictions("C")
@@ -0,0 +1,194 @@
+import asyncio
+
+import pytest
+
+from src.core.quota import (
+    QuotaExceededError,
+    QuotaGovernor,
+    TokenBucket,
+    charged_to_other_client,
+    quota_client,
+)
+from src.core.singleflight import SingleFlight
+
+
+def governor(**overrides) -> QuotaGovernor:
+    options = {
+        "global_rate": 0.001,
+        "global_burst": 10,
+        "client_rate": 0.001,
+        "client_burst": 2,
+        "max_concurrency": 2,
+        "queue_timeout": 0.05,
+    }
+    options.update(overrides)
+    return QuotaGovernor(**options)
+
+
+async def use_slot(quota: QuotaGovernor, client: str | None = None) -> None:
+    async with quota.slot(client):
+        pass
+
+
+def test_token_bucket_refills_up_to_burst():
+    bucket = TokenBucket(rate=1, burst=2)
+    now = bucket.updated
+    bucket.take()
+    bucket.take()
+    assert bucket.wait_time(now) == pytest.approx(1)
+    assert bucket.wait_time(now + 10) == 0
+    assert bucket.tokens == 2
+
+
+def test_client_bucket_rejects_with_retry_after():
+    async def scenario():
+        quota = governor()
+        await use_slot(quota, "1.2.3.4")
+        await use_slot(quota, "1.2.3.4")
+        with pytest.raises(QuotaExceededError) as rejected:
+            await use_slot(quota, "1.2.3.4")
+        # Another caller still has its own budget
+        await use_slot(quota, "5.6.7.8")
+        return quota, rejected.value
+
+    quota, error = asyncio.run(scenario())
+    assert error.reason == "client"
+    assert error.retry_after > 0
+    assert quota.stats()["admitted"] == 3
+    assert quota.stats()["rejected_client"] == 1
+
+
+def test_global_bucket_is_shared_by_all_clients():
+    async def scenario():
+        quota = governor(global_burst=2)
+        await use_slot(quota, "a")
+        await use_slot(quota, "b")
+        with pytest.raises(QuotaExceededError) as rejected:
+            await use_slot(quota, "c")
+        return rejected.value
+
+    assert asyncio.run(scenario()).reason == "global"
+
+
+def test_shared_client_has_its_own_bucket():
+    async def scenario():
+        quota = governor(shared_clients={"tiles": (0.001, 3)})
+        for _ in range(3):
+            await use_slot(quota, "tiles")
+        with pytest.raises(QuotaExceededError) as rejected:
+            await use_slot(quota, "tiles")
+        return quota, rejected.value
+
+    quota, error = asyncio.run(scenario())
+    assert error.reason == "shared"
+    assert quota.stats()["rejected_shared"] == 1
+
+
+def test_shared_clients_leave_the_reserve_to_other_clients():
+    async def scenario():
+        quota = governor(
+            global_burst=5, client_burst=5, shared_clients={"tiles": (0.001, 10)}, shared_reserve=3
+        )
+        for _ in range(2):
+            await use_slot(quota, "tiles")
+        with pytest.raises(QuotaExceededError) as rejected:
+            await use_slot(quota, "tiles")
+        available = quota.available("tiles")
+        for _ in range(3):
+            await use_slot(quota, "1.1.1.1")
+        return rejected.value, available
+
+    error, available = asyncio.run(scenario())
+    assert error.reason == "global"
+    assert available < 1
+
+
+def test_client_defaults_to_the_context_variable():
+    async def scenario():
+        quota = governor(client_burst=1)
+        quota_client.set("9.9.9.9")
+        await use_slot(quota)
+        with pytest.raises(QuotaExceededError):
+            await use_slot(quota, "9.9.9.9")
+
+    asyncio.run(scenario())
+
+
+def test_busy_slots_reject_and_refund():
+    async def scenario():
+        quota = governor(max_concurrency=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with quota.slot("holder"):
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        tokens = quota.global_bucket.tokens
+        with pytest.raises(QuotaExceededError) as rejected:
+            await use_slot(quota, "waiter")
+        refunded = quota.global_bucket.tokens == pytest.approx(tokens, abs=0.01)
+        release.set()
+        await holder
+        return quota, rejected.value, refunded
+
+    quota, error, refunded = asyncio.run(scenario())
+    assert error.reason == "busy"
+    assert refunded
+    assert quota.stats()["running"] == 0
+
+
+def test_waiters_are_not_charged_for_the_starting_callers_quota():
+    async def scenario():
+        quota = governor(client_burst=1)
+        flight = SingleFlight(rerun=charged_to_other_client)
+        await use_slot(quota, "1.1.1.1")
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            async with quota.slot():
+                return "result"
+
+        async def call(client: str):
+            quota_client.set(client)
+            return await flight.do("key", fetch)
+
+        return await asyncio.gather(
+            call("1.1.1.1"), call("2.2.2.2"), return_exceptions=True
+        )
+
+    starter, waiter = asyncio.run(scenario())
+    assert isinstance(starter, QuotaExceededError)
+    assert starter.reason == "client"
+    assert starter.client == "1.1.1.1"
+    # The waiter ran the call again under its own, unspent bucket
+    assert waiter == ("result", False)
+
+
+def test_global_rejections_are_shared():
+    async def scenario():
+        quota = governor(global_burst=1, client_burst=5)
+        flight = SingleFlight(rerun=charged_to_other_client)
+        runs = 0
+        await use_slot(quota, "1.1.1.1")
+
+        async def fetch():
+            nonlocal runs
+            runs += 1
+            await asyncio.sleep(0.01)
+            async with quota.slot():
+                return "result"
+
+        async def call(client: str):
+            quota_client.set(client)
+            return await flight.do("key", fetch)
+
+        results = await asyncio.gather(
+            call("1.1.1.1"), call("2.2.2.2"), return_exceptions=True
+        )
+        return results, runs
+
+    results, runs = asyncio.run(scenario())
+    assert runs == 1
+    assert all(isinstance(e, QuotaExceededError) and e.reason == "global" for e in results)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.core.dependencies import get_db
+from src.core.google_client import get_google_client
+from src.core.ranking import blended_scores, haversine_meters_array, rank_places
+from src.core.spatial_index import haversine_meters
+from src.routers import places
+
+
+def place(rating=None, reviews=None) -> dict:
+    return {"rating": rating, "userRatingCount": reviews}
+
+
+def test_vectorized_haversine_matches_scalar():
+    lats = np.array([3.1579, 3.0733])
+    lngs = np.array([101.7116, 101.6078])
+    distances = haversine_meters_array(3.1073, 101.6067, lats, lngs)
+    assert distances == pytest.approx([
+        haversine_meters(3.1073, 101.6067, 3.1579, 101.7116),
+        haversine_meters(3.1073, 101.6067, 3.0733, 101.6078),
+    ])
+
+
+def test_without_sort_input_order_is_kept():
+    places = [place(4.0, 10), place(3.0, 5), place(5.0, 1)]
+    order = rank_places(places, [True] * 3, np.array([300.0, 100.0, 200.0]), 1000)
+    assert order.tolist() == [0, 1, 2]
+
+
+def test_filters():
+    places = [place(4.5, 100), place(None, None), place(3.9, 500), place(4.8, 3)]
+    distances = np.zeros(4)
+    walk_in = [True, True, False, True]
+
+    assert rank_places(places, walk_in, distances, 1000, walk_in_only=True).tolist() == [0, 1, 3]
+    # Unrated places never pass a rating filter
+    assert rank_places(places, walk_in, distances, 1000, min_rating=4.0).tolist() == [0, 3]
+    assert rank_places(places, walk_in, distances, 1000, min_review_count=50).tolist() == [0, 2]
+
+
+def test_sort_by_distance_and_limit():
+    places = [place()] * 4
+    order = rank_places(places, [True] * 4, np.array([400.0, 100.0, 300.0, 200.0]), 1000,
+                        sort="distance", limit=3)
+    assert order.tolist() == [1, 3, 2]
+
+
+def test_sort_by_rating_puts_unrated_last_and_breaks_ties_by_distance():
+    places = [place(None, None), place(4.0, 10), place(4.5, 10), place(4.0, 10)]
+    order = rank_places(places, [True] * 4, np.array([10.0, 300.0, 500.0, 100.0]), 1000,
+                        sort="rating")
+    assert order.tolist() == [2, 3, 1, 0]
+
+
+def test_score_prefers_many_reviews_over_a_few_perfect_ones():
+    places = [place(5.0, 3), place(4.7, 3000)]
+    order = rank_places(places, [True] * 2, np.array([100.0, 100.0]), 1000, sort="score")
+    assert order.tolist() == [1, 0]
+
+
+def test_blended_score_rewards_closeness():
+    scores = blended_scores(
+        np.array([4.0, 4.0]), np.array([100.0, 100.0]), np.array([0.0, 1000.0]), 1000,
+        prior_rating=4.0, prior_reviews=20, distance_weight=0.3,
+    )
+    assert scores[0] - scores[1] == pytest.approx(0.3)
+
+
+@pytest.mark.parametrize("path, query", [
+    ("/places/nearby-gyms", "limit=0"),
+    ("/places/nearby-gyms", "limit=501"),
+    ("/places/nearby-gyms", "min_rating=9"),
+    ("/places/nearby-gyms", "min_review_count=-1"),
+    ("/places/nearby-gyms", "radius=50"),
+    ("/places/nearby-gyms", "sort=popular"),
+    ("/places/nearby-gyms/stream", "radius=50"),
+    ("/places/nearby-gyms/stream", "radius=60000"),
+])
+def test_invalid_query_parameters_are_rejected(path, query):
+    app = FastAPI()
+    app.include_router(places.router)
+    # Validation fails before either dependency would be used
+    app.dependency_overrides[get_db] = lambda: None
+    app.dependency_overrides[get_google_client] = lambda: None
+
+    response = TestClient(app).get(f"{path}?lat=3.1579&lng=101.7116&{query}")
+    assert response.status_code == 422
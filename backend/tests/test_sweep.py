@@ -0,0 +1,102 @@
+import asyncio
+import itertools
+import math
+import random
+
+import httpx
+import pytest
+
+from src.core.config import settings
+from src.core.google_client import GoogleClient
+from src.core.quota import QuotaGovernor
+from src.core.search_geometry import split_circle, sweep_circles
+from src.core.spatial_index import METERS_PER_DEGREE_LAT, haversine_meters
+from src.routers.places import full_nearby_areas, nearby_cache, sweep_nearby_place_payloads
+
+KLCC = (3.1579, 101.7116)
+
+
+def random_point_in(lat: float, lng: float, radius: float, rng: random.Random) -> tuple[float, float]:
+    distance = radius * math.sqrt(rng.random())
+    angle = rng.uniform(0, 2 * math.pi)
+    return (
+        lat + distance * math.sin(angle) / METERS_PER_DEGREE_LAT,
+        lng + distance * math.cos(angle) / (METERS_PER_DEGREE_LAT * math.cos(math.radians(lat))),
+    )
+
+
+def assert_covered(lat: float, lng: float, radius: float, circles: list[tuple[float, float, int]]):
+    rng = random.Random(1)
+    for _ in range(2000):
+        point = random_point_in(lat, lng, radius, rng)
+        assert any(
+            haversine_meters(*point, circle_lat, circle_lng) <= circle_radius
+            for circle_lat, circle_lng, circle_radius in circles
+        ), point
+
+
+def test_small_search_is_not_swept():
+    assert sweep_circles(*KLCC, 800) == [(*KLCC, 800)]
+
+
+@pytest.mark.parametrize("radius", [2000, 5000, 20000, 50000])
+def test_sweep_covers_the_search(radius):
+    circles = sweep_circles(*KLCC, radius)
+    assert 1 < len(circles) <= 19
+    assert_covered(*KLCC, radius, circles)
+
+
+def test_sweep_sub_circles_respect_the_minimum_radius():
+    assert all(circle[2] >= 1000 for circle in sweep_circles(*KLCC, 3000))
+
+
+def test_split_circle_covers_its_parent():
+    children = split_circle(*KLCC, 3000)
+    assert len(children) == 7
+    assert all(child[2] == 2000 for child in children)
+    assert_covered(*KLCC, 3000, children)
+
+
+def full_page_google(governor: QuotaGovernor) -> GoogleClient:
+    """Google client whose every searchNearby returns a full page"""
+    ids = itertools.count()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"places": [
+            {
+                "id": f"place-{next(ids)}",
+                "displayName": {"text": "Gym"},
+                "location": {"latitude": KLCC[0], "longitude": KLCC[1]},
+            }
+            for _ in range(20)
+        ]})
+
+    return GoogleClient("key", transport=httpx.MockTransport(handler), governor=governor)
+
+
+def test_splits_leave_the_callers_reserve():
+    governor = QuotaGovernor(
+        global_rate=0.001,
+        global_burst=1000,
+        client_rate=0.001,
+        client_burst=settings.QUOTA_CLIENT_BURST,
+        max_concurrency=8,
+        queue_timeout=1,
+    )
+    truncated = set()
+
+    async def scenario():
+        google = full_page_google(governor)
+        try:
+            await sweep_nearby_place_payloads(google, *KLCC, 5000, {}, set(), truncated)
+        finally:
+            await google.aclose()
+            nearby_cache.clear()
+            full_nearby_areas.clear()
+
+    asyncio.run(scenario())
+    stats = governor.stats()
+    assert stats["rejected_client"] == 0
+    assert 19 < stats["admitted"] <= settings.NEARBY_SWEEP_MAX_SEARCHES
+    assert governor.available() >= settings.NEARBY_SWEEP_SPLIT_RESERVE
+    assert truncated
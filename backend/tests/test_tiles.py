@@ -0,0 +1,65 @@
+import pytest
+
+from src.core.spatial_index import haversine_meters
+from src.core.tiles import (
+    ancestor_tile,
+    bounds_circle,
+    bounds_contain,
+    bounds_intersect,
+    descendant_tiles,
+    is_valid_tile,
+    tile_bounds,
+)
+
+
+def test_whole_world_tile():
+    bounds = tile_bounds(0, 0, 0)
+    assert bounds["west"] == -180
+    assert bounds["east"] == 180
+    assert bounds["north"] == pytest.approx(85.0511, abs=1e-4)
+    assert bounds["south"] == pytest.approx(-85.0511, abs=1e-4)
+
+
+def test_kl_tile_contains_klcc():
+    bounds = tile_bounds(14, 12821, 8048)
+    assert bounds_contain(bounds, 3.1579, 101.7116)
+
+
+def test_neighbouring_tiles_never_share_a_point():
+    left = tile_bounds(14, 12821, 8048)
+    right = tile_bounds(14, 12822, 8048)
+    edge_lat = (left["north"] + left["south"]) / 2
+    assert not bounds_contain(left, edge_lat, left["east"])
+    assert bounds_contain(right, edge_lat, right["west"])
+    assert not bounds_intersect(left, right)
+
+
+def test_is_valid_tile():
+    assert is_valid_tile(2, 3, 3)
+    assert not is_valid_tile(2, 4, 0)
+    assert not is_valid_tile(2, 0, -1)
+
+
+def test_bounds_circle_reaches_every_corner():
+    bounds = tile_bounds(14, 12821, 8048)
+    lat, lng, radius = bounds_circle(bounds)
+    for corner_lat in (bounds["north"], bounds["south"]):
+        for corner_lng in (bounds["east"], bounds["west"]):
+            assert haversine_meters(lat, lng, corner_lat, corner_lng) <= radius
+
+
+def test_descendants_and_ancestor_round_trip():
+    children = descendant_tiles(13, 6410, 4024, 14)
+    assert sorted(children) == [
+        (14, 12820, 8048), (14, 12820, 8049), (14, 12821, 8048), (14, 12821, 8049)
+    ]
+    assert {ancestor_tile(*child, 13) for child in children} == {(13, 6410, 4024)}
+
+
+def test_descendants_cover_the_parent_exactly():
+    parent = tile_bounds(13, 6410, 4024)
+    children = [tile_bounds(*tile) for tile in descendant_tiles(13, 6410, 4024, 15)]
+    assert min(child["west"] for child in children) == pytest.approx(parent["west"])
+    assert max(child["east"] for child in children) == pytest.approx(parent["east"])
+    assert max(child["north"] for child in children) == pytest.approx(parent["north"])
+    assert min(child["south"] for child in children) == pytest.approx(parent["south"])